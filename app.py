@@ -15,48 +15,83 @@ FITUR LENGKAP:
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
+import time
 from datetime import datetime, timedelta
 
 # Import modul custom
 from modules.data_handler import *
-from modules.chart_handler import *
 from modules.utils import *
 
-# Import barcode handler dengan error handling untuk Windows
-try:
-    from modules.barcode_handler import *
-    BARCODE_MODULE_LOADED = True
-except Exception as e:
-    BARCODE_MODULE_LOADED = False
-    print(f"⚠️ Warning: Barcode scanner tidak tersedia - {e}")
-    print("💡 Aplikasi tetap bisa digunakan dengan fitur lain")
-    
-    # Define dummy functions jika module gagal load
-    def generate_barcode(barcode_id, product_name):
-        """Dummy function - barcode generation disabled"""
+# Modul berat (plotly, opencv, scanner) baru di-import saat pertama dipakai
+@st.cache_resource(show_spinner=False)
+def _chart_handler():
+    """Muat modul chart_handler sekali per proses"""
+    from modules import chart_handler
+    return chart_handler
+
+@st.cache_resource(show_spinner=False)
+def _barcode_handler():
+    """Muat modul barcode_handler sekali per proses (None jika gagal, mis. di Windows tanpa ZBar)"""
+    try:
+        from modules import barcode_handler
+        return barcode_handler
+    except Exception as e:
+        print(f"⚠️ Warning: Barcode scanner tidak tersedia - {e}")
+        print("💡 Aplikasi tetap bisa digunakan dengan fitur lain")
         return None
-    
-    def generate_batch_barcodes(products_df):
-        """Dummy function - batch barcode generation disabled"""
+
+# Wrapper barcode dengan fallback jika module gagal load
+def generate_barcode(barcode_id, product_name):
+    """Generate barcode, None jika fitur barcode tidak tersedia"""
+    handler = _barcode_handler()
+    if handler is None:
+        return None
+    return handler.generate_barcode(barcode_id, product_name)
+
+def generate_batch_barcodes(products_df):
+    """Generate barcode batch dengan fallback pesan jika fitur tidak tersedia"""
+    handler = _barcode_handler()
+    if handler is None:
         return {
             'success': False,
             'message': 'Fitur generate barcode tidak tersedia. Install ZBar untuk mengaktifkan.'
         }
-    
-    def scan_barcode_from_camera():
-        """Dummy function - camera scanner disabled"""
+    return handler.generate_batch_barcodes(products_df)
+
+def scan_barcode_from_camera():
+    """Scan webcam dengan fallback pesan jika scanner tidak tersedia"""
+    handler = _barcode_handler()
+    if handler is None:
         return {
             'success': False,
             'message': 'Webcam scanner tidak tersedia. Gunakan Input Manual.'
         }
-    
-    def check_scanner_availability():
-        """Return scanner not available"""
+    return handler.scan_barcode_from_camera()
+
+def scan_barcode_from_camera_streamlit():
+    """Scan webcam (preview browser) dengan fallback pesan jika scanner tidak tersedia"""
+    handler = _barcode_handler()
+    if handler is None:
+        return {
+            'success': False,
+            'message': 'Webcam scanner tidak tersedia. Gunakan Input Manual.'
+        }
+    return handler.scan_barcode_from_camera_streamlit()
+
+def check_scanner_availability():
+    """Cek scanner, tidak tersedia jika module barcode gagal load"""
+    handler = _barcode_handler()
+    if handler is None:
         return {
             'available': False,
             'message': '⚠️ Webcam scanner tidak tersedia - Gunakan input manual'
         }
+    return handler.check_scanner_availability()
+
+# Pilihan filter kategori di tab Lihat Data (CATEGORIES dari data_handler)
+FILTER_CATEGORIES = ("Semua",) + CATEGORIES
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -67,49 +102,52 @@ st.set_page_config(
 )
 
 # CSS Custom
+CUSTOM_CSS = """
+<style>
+.main-header {
+    font-size: 2.5rem;
+    font-weight: bold;
+    text-align: center;
+    padding: 1rem;
+    background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
+    color: white;
+    border-radius: 10px;
+    margin-bottom: 2rem;
+    box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+}
+.metric-card {
+    background: white;
+    padding: 1rem;
+    border-radius: 10px;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+    border-left: 4px solid #667eea;
+}
+.alert-danger {
+    background: #fee;
+    padding: 1rem;
+    border-radius: 5px;
+    border-left: 4px solid #f44;
+    margin: 1rem 0;
+}
+.alert-success {
+    background: #efe;
+    padding: 1rem;
+    border-radius: 5px;
+    border-left: 4px solid #4f4;
+    margin: 1rem 0;
+}
+.stButton>button {
+    width: 100%;
+    border-radius: 5px;
+    height: 3em;
+    font-weight: bold;
+}
+</style>
+"""
+
 def load_custom_css():
-    st.markdown("""
-        <style>
-        .main-header {
-            font-size: 2.5rem;
-            font-weight: bold;
-            text-align: center;
-            padding: 1rem;
-            background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border-radius: 10px;
-            margin-bottom: 2rem;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }
-        .metric-card {
-            background: white;
-            padding: 1rem;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            border-left: 4px solid #667eea;
-        }
-        .alert-danger {
-            background: #fee;
-            padding: 1rem;
-            border-radius: 5px;
-            border-left: 4px solid #f44;
-            margin: 1rem 0;
-        }
-        .alert-success {
-            background: #efe;
-            padding: 1rem;
-            border-radius: 5px;
-            border-left: 4px solid #4f4;
-            margin: 1rem 0;
-        }
-        .stButton>button {
-            width: 100%;
-            border-radius: 5px;
-            height: 3em;
-            font-weight: bold;
-        }
-        </style>
-    """, unsafe_allow_html=True)
+    # Dikirim tiap rerun: elemen yang tidak dipanggil ulang dihapus Streamlit dari halaman
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # Inisialisasi session state
 def init_session_state():
@@ -122,6 +160,126 @@ def init_session_state():
     if 'show_barcode_info' not in st.session_state:
         st.session_state.show_barcode_info = False
 
+# Fragment: widget di dalamnya hanya me-rerun fungsi itu, bukan seluruh app.
+# st.fragment (Streamlit >= 1.37) / st.experimental_fragment (1.33); versi lebih lama
+# (termasuk 1.31 di requirements) tetap jalan sebagai fungsi biasa
+_fragment = (getattr(st, "fragment", None)
+             or getattr(st, "experimental_fragment", None)
+             or (lambda func: func))
+
+# Frame data yang dimuat sekali di awal main() dan dipakai sidebar + halaman pada rerun yang sama.
+# save_products_data/save_transactions_data menghapus key ini sehingga pembacaan berikutnya memuat ulang.
+def _current_products():
+    """Data produk untuk rerun ini"""
+    if '_products_df' not in st.session_state:
+        st.session_state['_products_df'] = load_products_data()
+    return st.session_state['_products_df']
+
+def _current_transactions():
+    """Data transaksi untuk rerun ini"""
+    if '_transactions_df' not in st.session_state:
+        st.session_state['_transactions_df'] = load_transactions_data()
+    return st.session_state['_transactions_df']
+
+# Helper cache untuk halaman
+@st.cache_data(ttl=5, show_spinner=False)
+def _existing_barcode_ids(folder_mtime):
+    """Kumpulkan ID produk yang sudah punya file barcode (satu kali baca folder)"""
+    try:
+        with os.scandir("barcodes") as entries:
+            return {entry.name[:-4] for entry in entries if entry.name.endswith(".png")}
+    except FileNotFoundError:
+        return set()
+    except OSError as e:
+        # Folder tidak bisa di-list (mis. network share): pemanggil cek per file
+        print(f"Error scanning barcodes folder: {e}")
+        return None
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _barcode_ids(products_mtime):
+    """Daftar barcode_id untuk selectbox, dibangun ulang hanya saat file produk berubah"""
+    return load_products_indexed().index.tolist()
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _barcode_image_bytes(barcode_id, file_mtime):
+    """Isi file PNG barcode (None jika belum di-generate), dibaca sekali per versi file"""
+    try:
+        with open(f"barcodes/{barcode_id}.png", "rb") as file:
+            return file.read()
+    except OSError:
+        return None
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _product_detail(barcode_id, products_mtime):
+    """Data + markdown panel detail produk di halaman scan (None jika produk tidak ada)"""
+    product = get_product_by_barcode(barcode_id)
+    if product is None:
+        return None
+    
+    margin = calculate_profit_margin(product['harga_jual'], product['harga_modal'])
+    info_md = f"""
+                **Barcode ID:** {product['barcode_id']}  
+                **Nama Produk:** {product['nama_produk']}  
+                **Kategori:** {product['kategori']}  
+                **Stok Tersedia:** {product['stok']}
+                """
+    price_md = f"""
+                **Harga Modal:** {format_currency(product['harga_modal'])}  
+                **Harga Jual:** {format_currency(product['harga_jual'])}  
+                **Margin:** {margin:.1f}%
+                """
+    return {'product': product, 'info_md': info_md, 'price_md': price_md}
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _dashboard_statistics(products_mtime, transactions_mtime, today):
+    """Statistik dashboard; dihitung ulang hanya saat file data berubah atau ganti hari"""
+    return _chart_handler().calculate_statistics(load_products_data(), load_transactions_data())
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _dashboard_figures(products_mtime, transactions_mtime):
+    """Bangun grafik dashboard sekali per perubahan data"""
+    products_df = load_products_data()
+    transactions_df = load_transactions_data()
+    figs = {}
+    if not products_df.empty:
+        figs['stock'] = _chart_handler().create_stock_chart(products_df)
+    if not transactions_df.empty:
+        daily_df = _chart_handler().aggregate_daily(transactions_df)
+        figs['profit'] = _chart_handler().create_profit_chart(transactions_df, daily_df)
+        figs['sales'] = _chart_handler().create_sales_chart(transactions_df, daily_df)
+        figs['product_sales'] = _chart_handler().create_product_sales_chart(transactions_df)
+    return figs
+
+def _filter_period(transactions_df, start_date, end_date):
+    """Ambil transaksi dalam periode [start_date, end_date] (data sudah urut waktu dari loader)"""
+    start_ts = pd.Timestamp(start_date)
+    end_ts = pd.Timestamp(end_date) + pd.Timedelta(days=1)  # batas akhir eksklusif
+    waktu_values = transactions_df['waktu'].to_numpy()
+    lo, hi = np.searchsorted(waktu_values, [start_ts.to_datetime64(), end_ts.to_datetime64()])
+    return transactions_df.iloc[lo:hi]
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _laporan_report(start_date, end_date, transactions_mtime):
+    """Ringkasan + grafik laporan, dibangun ulang hanya saat periode atau data berubah"""
+    filtered_df = _filter_period(load_transactions_data(), start_date, end_date)
+    chart_handler = _chart_handler()
+    
+    # Metrik langsung dari array NumPy (nansum/nanmean: aman jika ada sel kosong)
+    total_arr = filtered_df['total_harga'].to_numpy()
+    profit_arr = filtered_df['keuntungan'].to_numpy()
+    
+    # Agregasi sekali, dipakai bersama oleh semua tab grafik
+    daily_df = chart_handler.aggregate_daily(filtered_df)
+    product_sales = chart_handler.aggregate_product_sales(filtered_df)
+    return {
+        'total_pendapatan': np.nansum(total_arr),
+        'total_keuntungan': np.nansum(profit_arr),
+        'rata_rata': np.nanmean(total_arr),
+        'sales': chart_handler.create_sales_chart(filtered_df, daily_df),
+        'profit': chart_handler.create_profit_chart(filtered_df, daily_df),
+        'product_sales': chart_handler.create_product_sales_chart(filtered_df, product_sales)
+    }
+
 # Login page
 def login_page():
     st.markdown("<h1 class='main-header'>🏪 Login Kantin Sekolah</h1>", unsafe_allow_html=True)
@@ -140,7 +298,7 @@ def login_page():
         
         **Teknologi:**
         - Python + Streamlit
-        - CSV untuk penyimpanan data
+        - CSV (produk) & Parquet (transaksi) untuk penyimpanan data
         - Barcode Code128
         - 100% Offline
         
@@ -175,9 +333,14 @@ def login_page():
 def dashboard_page():
     st.markdown("<h1 class='main-header'>📊 Dashboard Kantin Sekolah</h1>", unsafe_allow_html=True)
     
-    products_df = load_products_data()
-    transactions_df = load_transactions_data()
-    stats = calculate_statistics(products_df, transactions_df)
+    products_df = _current_products()
+    transactions_df = _current_transactions()
+    stats = _dashboard_statistics(
+        get_file_mtime(PRODUCTS_FILE),
+        get_file_mtime(get_transactions_path()),
+        datetime.now().date().isoformat()
+    )
+    figs = _dashboard_figures(get_file_mtime(PRODUCTS_FILE), get_file_mtime(get_transactions_path()))
     
     # Metrik Cards
     col1, col2, col3, col4 = st.columns(4)
@@ -199,13 +362,14 @@ def dashboard_page():
     
     # Alert Stok Menipis
     if not products_df.empty:
-        low_stock = products_df[products_df['stok'] < 10]
+        low_stock = products_df.loc[products_df['stok'] < 10, ['nama_produk', 'stok']]
         if not low_stock.empty:
             st.markdown('<div class="alert-danger">', unsafe_allow_html=True)
             st.warning(f"⚠️ **PERINGATAN:** Ada {len(low_stock)} produk dengan stok menipis (< 10)!")
             with st.expander("Lihat Detail Produk Stok Menipis"):
-                for idx, row in low_stock.iterrows():
-                    st.write(f"- **{row['nama_produk']}**: Stok tersisa {row['stok']}")
+                lines = ("- **" + low_stock['nama_produk'].astype(str) +
+                         "**: Stok tersisa " + low_stock['stok'].astype(str)).tolist()
+                st.markdown("\n".join(lines))
             st.markdown('</div>', unsafe_allow_html=True)
     
     # Grafik
@@ -214,16 +378,14 @@ def dashboard_page():
     with col1:
         st.subheader("📈 Stok Produk (Top 10)")
         if not products_df.empty:
-            fig = create_stock_chart(products_df)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(figs['stock'], use_container_width=True)
         else:
             st.info("Belum ada data produk")
     
     with col2:
         st.subheader("💰 Keuntungan Harian")
         if not transactions_df.empty:
-            fig = create_profit_chart(transactions_df)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(figs['profit'], use_container_width=True)
         else:
             st.info("Belum ada data transaksi")
     
@@ -233,13 +395,11 @@ def dashboard_page():
         
         with col3:
             st.subheader("📊 Penjualan Harian")
-            fig = create_sales_chart(transactions_df)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(figs['sales'], use_container_width=True)
         
         with col4:
             st.subheader("🏆 Produk Terlaris")
-            fig = create_product_sales_chart(transactions_df)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(figs['product_sales'], use_container_width=True)
 
 # Data Master page
 def data_master_page():
@@ -255,7 +415,7 @@ def data_master_page():
             with col1:
                 barcode_id = st.text_input("Barcode ID *", placeholder="BRK001")
                 nama_produk = st.text_input("Nama Produk *", placeholder="Aqua 600ml")
-                kategori = st.selectbox("Kategori *", ["Makanan", "Minuman", "Snack", "Alat Tulis", "Lainnya"])
+                kategori = st.selectbox("Kategori *", CATEGORIES)
             with col2:
                 stok = st.number_input("Stok Awal *", min_value=0, value=0)
                 harga_modal = st.number_input("Harga Modal (Rp) *", min_value=0, value=0, step=100)
@@ -278,12 +438,15 @@ def data_master_page():
                                 # Tampilkan preview barcode
                                 if os.path.exists(barcode_path):
                                     st.image(barcode_path, caption=f"Barcode: {barcode_id}", width=300)
-                            st.balloons()
+                            st.toast("✅ Produk tersimpan", icon="🎉")
                         else:
                             st.error(result['message'])
                 else:
                     st.error("❌ Semua field wajib diisi!")
     
+    # Muat produk sekali untuk semua tab di bawah (setelah tab Tambah agar produk baru ikut tampil)
+    products = load_products_indexed()
+    
     # Tab Lihat Data
     with tab2:
         st.subheader("Daftar Semua Produk")
@@ -293,14 +456,14 @@ def data_master_page():
         with search_col1:
             search_keyword = st.text_input("🔍 Cari produk...", placeholder="Nama atau Barcode ID")
         with search_col2:
-            kategori_filter = st.selectbox("Filter Kategori", ["Semua", "Makanan", "Minuman", "Snack", "Alat Tulis", "Lainnya"])
+            kategori_filter = st.selectbox("Filter Kategori", FILTER_CATEGORIES)
         
-        df = load_products_data()
+        df = products
         
         if not df.empty:
             # Apply filters
             if search_keyword:
-                df = search_product(search_keyword)
+                df = search_product(search_keyword, df)
             
             if kategori_filter != "Semua":
                 df = df[df['kategori'] == kategori_filter]
@@ -312,7 +475,7 @@ def data_master_page():
             with col2:
                 st.metric("Total Stok", df['stok'].sum())
             with col3:
-                total_value = (df['stok'] * df['harga_modal']).sum()
+                total_value = calculate_stock_value(df)
                 st.metric("Nilai Stok", format_currency(total_value))
             
             st.dataframe(df, use_container_width=True, hide_index=True)
@@ -322,23 +485,24 @@ def data_master_page():
     # Tab Edit
     with tab3:
         st.subheader("Edit Data Produk")
-        df = load_products_data()
+        df = products
         
         if not df.empty:
-            barcode_list = df['barcode_id'].tolist()
+            barcode_list = _barcode_ids(get_file_mtime(PRODUCTS_FILE))
             selected_barcode = st.selectbox("Pilih Produk", barcode_list)
             
             if selected_barcode:
-                product = df[df['barcode_id'] == selected_barcode].iloc[0]
+                product = df.loc[[selected_barcode]].iloc[0]  # barcode_id bisa dobel (import CSV): ambil baris pertama
                 
                 with st.form("form_edit"):
                     st.info(f"Edit produk: **{product['nama_produk']}**")
                     col1, col2 = st.columns(2)
                     with col1:
                         new_nama = st.text_input("Nama Produk", value=product['nama_produk'])
+                        kategori_options = df['kategori'].cat.categories
                         new_kategori = st.selectbox("Kategori", 
-                                                   ["Makanan", "Minuman", "Snack", "Alat Tulis", "Lainnya"],
-                                                   index=["Makanan", "Minuman", "Snack", "Alat Tulis", "Lainnya"].index(product['kategori']))
+                                                   kategori_options,
+                                                   index=kategori_options.get_loc(product['kategori']))
                     with col2:
                         new_stok = st.number_input("Stok", value=int(product['stok']), min_value=0)
                         new_harga_modal = st.number_input("Harga Modal", value=int(product['harga_modal']), min_value=0)
@@ -369,7 +533,7 @@ def data_master_page():
         - Generate barcode setelah import data produk
         """)
         
-        df = load_products_data()
+        df = products
         
         if not df.empty:
             col1, col2 = st.columns([2, 1])
@@ -377,17 +541,19 @@ def data_master_page():
             with col1:
                 st.markdown("### 📊 Status Barcode")
                 
-                # Check existing barcodes
+                # Check existing barcodes (satu kali scan folder, bukan stat per produk)
                 total_products = len(df)
-                existing_barcodes = 0
-                missing_barcodes = []
-                
-                for idx, row in df.iterrows():
-                    barcode_path = f"barcodes/{row['barcode_id']}.png"
-                    if os.path.exists(barcode_path):
-                        existing_barcodes += 1
-                    else:
-                        missing_barcodes.append(row['barcode_id'])
+                existing = _existing_barcode_ids(get_file_mtime("barcodes"))
+                if existing is not None:
+                    has_barcode = df['barcode_id'].astype(str).isin(existing).to_numpy()
+                else:
+                    ids = df['barcode_id'].to_numpy()
+                    has_barcode = np.fromiter(
+                        (os.path.exists(f"barcodes/{bid}.png") for bid in ids),
+                        dtype=bool, count=len(ids)
+                    )
+                existing_barcodes = int(has_barcode.sum())
+                missing_barcodes = df.loc[~has_barcode, 'barcode_id'].tolist()
                 
                 col_stat1, col_stat2, col_stat3 = st.columns(3)
                 with col_stat1:
@@ -399,9 +565,10 @@ def data_master_page():
                 
                 if missing_barcodes:
                     with st.expander(f"📋 Lihat {len(missing_barcodes)} Produk Tanpa Barcode"):
-                        for barcode_id in missing_barcodes:
-                            product = df[df['barcode_id'] == barcode_id].iloc[0]
-                            st.write(f"- **{barcode_id}**: {product['nama_produk']}")
+                        missing_df = df.loc[~has_barcode, ['barcode_id', 'nama_produk']]
+                        lines = ("- **" + missing_df['barcode_id'].astype(str) +
+                                 "**: " + missing_df['nama_produk'].astype(str)).tolist()
+                        st.markdown("\n".join(lines))
             
             with col2:
                 st.markdown("### 🎯 Pilihan Generate")
@@ -434,10 +601,9 @@ def data_master_page():
                                 
                                 if result['failed_items']:
                                     with st.expander("Lihat Item yang Gagal"):
-                                        for item in result['failed_items']:
-                                            st.write(f"- {item}")
+                                        st.markdown("\n".join(f"- {item}" for item in result['failed_items']))
                                 
-                                st.balloons()
+                                st.toast("✅ Generate barcode selesai", icon="🏷️")
                             else:
                                 st.error(result['message'])
                 
@@ -446,7 +612,7 @@ def data_master_page():
                         if st.button(f"🏷️ GENERATE {len(missing_barcodes)} BARCODE", use_container_width=True, type="primary"):
                             with st.spinner(f"Generating {len(missing_barcodes)} barcode..."):
                                 # Filter only missing barcodes
-                                df_missing = df[df['barcode_id'].isin(missing_barcodes)]
+                                df_missing = df.loc[~has_barcode]
                                 result = generate_batch_barcodes(df_missing)
                                 
                                 if result['success']:
@@ -458,7 +624,7 @@ def data_master_page():
                                     with col_res2:
                                         st.metric("❌ Gagal", len(result['failed_items']))
                                     
-                                    st.balloons()
+                                    st.toast("✅ Generate barcode selesai", icon="🏷️")
                                 else:
                                     st.error(result['message'])
                     else:
@@ -473,24 +639,24 @@ def data_master_page():
             
             with col_prev1:
                 if len(df) > 0:
-                    barcode_list = df['barcode_id'].tolist()
+                    barcode_list = _barcode_ids(get_file_mtime(PRODUCTS_FILE))
                     selected_preview = st.selectbox("Pilih barcode untuk preview:", barcode_list)
             
             with col_prev2:
                 if selected_preview:
                     barcode_path = f"barcodes/{selected_preview}.png"
-                    if os.path.exists(barcode_path):
-                        product = df[df['barcode_id'] == selected_preview].iloc[0]
-                        st.image(barcode_path, caption=f"{product['nama_produk']} - {selected_preview}", width=400)
+                    image_bytes = _barcode_image_bytes(selected_preview, get_file_mtime(barcode_path))
+                    if image_bytes is not None:
+                        product = df.loc[[selected_preview]].iloc[0]
+                        st.image(image_bytes, caption=f"{product['nama_produk']} - {selected_preview}", width=400)
                         
-                        # Download button
-                        with open(barcode_path, "rb") as file:
-                            btn = st.download_button(
-                                label="📥 Download Barcode",
-                                data=file,
-                                file_name=f"{selected_preview}.png",
-                                mime="image/png"
-                            )
+                        # Download button (pakai bytes yang sama dengan preview)
+                        btn = st.download_button(
+                            label="📥 Download Barcode",
+                            data=image_bytes,
+                            file_name=f"{selected_preview}.png",
+                            mime="image/png"
+                        )
                     else:
                         st.warning(f"⚠️ Barcode untuk {selected_preview} belum di-generate")
             
@@ -535,14 +701,14 @@ def data_master_page():
     # Tab Tambah Stok
     with tab4:
         st.subheader("Tambah Stok Produk")
-        df = load_products_data()
+        df = products
         
         if not df.empty:
-            barcode_list = df['barcode_id'].tolist()
+            barcode_list = _barcode_ids(get_file_mtime(PRODUCTS_FILE))
             selected_barcode = st.selectbox("Pilih Produk untuk Tambah Stok", barcode_list, key="add_stock")
             
             if selected_barcode:
-                product = df[df['barcode_id'] == selected_barcode].iloc[0]
+                product = df.loc[[selected_barcode]].iloc[0]
                 
                 col1, col2 = st.columns([1, 2])
                 with col1:
@@ -557,7 +723,7 @@ def data_master_page():
                         result = add_stock(selected_barcode, jumlah_tambah)
                         if result['success']:
                             st.success(result['message'])
-                            st.balloons()
+                            st.toast("✅ Stok bertambah", icon="📦")
                             st.rerun()
                         else:
                             st.error(result['message'])
@@ -569,14 +735,14 @@ def data_master_page():
         st.subheader("Hapus Produk")
         st.warning("⚠️ **PERHATIAN:** Menghapus produk akan menghapus semua data terkait termasuk barcode!")
         
-        df = load_products_data()
+        df = products
         
         if not df.empty:
-            barcode_list = df['barcode_id'].tolist()
+            barcode_list = _barcode_ids(get_file_mtime(PRODUCTS_FILE))
             selected_barcode = st.selectbox("Pilih Produk yang Akan Dihapus", barcode_list, key="delete")
             
             if selected_barcode:
-                product = df[df['barcode_id'] == selected_barcode].iloc[0]
+                product = df.loc[[selected_barcode]].iloc[0]
                 
                 st.error(f"""
                 **Produk yang akan dihapus:**
@@ -636,9 +802,7 @@ def scan_page():
             if result['success']:
                 st.session_state.last_scan = result['barcode_id']
                 st.success(result['message'])
-                st.balloons()
-                time.sleep(1)
-                st.rerun()
+                st.toast("✅ Barcode terdeteksi", icon="📷")
             elif result['message'] != "Ambil foto barcode terlebih dahulu":
                 st.error(result['message'])
             
@@ -660,8 +824,7 @@ def scan_page():
                     if result['success']:
                         st.session_state.last_scan = result['barcode_id']
                         st.success(result['message'])
-                        st.balloons()
-                        st.rerun()
+                        st.toast("✅ Barcode terdeteksi", icon="📷")
                     else:
                         st.error(result['message'])
         
@@ -700,7 +863,6 @@ def scan_page():
             if st.button("🔍 Cari Produk", use_container_width=True, type="primary"):
                 if barcode_input:
                     st.session_state.last_scan = barcode_input
-                    st.rerun()
                 else:
                     st.warning("⚠️ Masukkan Barcode ID terlebih dahulu!")
     
@@ -709,32 +871,26 @@ def scan_page():
         st.markdown("---")
         st.subheader("📦 Detail Produk")
         
-        product = get_product_by_barcode(st.session_state.last_scan)
+        detail = _product_detail(st.session_state.last_scan, get_file_mtime(PRODUCTS_FILE))
         
-        if product is not None:
+        if detail is not None:
+            product = detail['product']
+            
             # Display product info
             col1, col2, col3 = st.columns([2, 2, 1])
             
             with col1:
-                st.markdown(f"""
-                **Barcode ID:** {product['barcode_id']}  
-                **Nama Produk:** {product['nama_produk']}  
-                **Kategori:** {product['kategori']}  
-                **Stok Tersedia:** {product['stok']}
-                """)
+                st.markdown(detail['info_md'])
             
             with col2:
-                st.markdown(f"""
-                **Harga Modal:** {format_currency(product['harga_modal'])}  
-                **Harga Jual:** {format_currency(product['harga_jual'])}  
-                **Margin:** {calculate_profit_margin(product['harga_jual'], product['harga_modal']):.1f}%
-                """)
+                st.markdown(detail['price_md'])
             
             with col3:
-                # Preview barcode jika ada
+                # Preview barcode jika ada (dicek di luar cache produk: file bisa dibuat kapan saja)
                 barcode_path = f"barcodes/{product['barcode_id']}.png"
-                if os.path.exists(barcode_path):
-                    st.image(barcode_path, caption="Barcode", width=150)
+                image_bytes = _barcode_image_bytes(product['barcode_id'], get_file_mtime(barcode_path))
+                if image_bytes is not None:
+                    st.image(image_bytes, caption="Barcode", width=150)
             
             # Form Transaksi
             st.markdown("---")
@@ -780,7 +936,7 @@ def scan_page():
                         
                         if result['success']:
                             st.success(result['message'])
-                            st.balloons()
+                            st.toast("✅ Transaksi berhasil", icon="💸")
                             
                             # Show transaction summary
                             st.markdown("---")
@@ -814,31 +970,34 @@ def scan_page():
                     st.rerun()
 
 # Laporan page
+@_fragment
 def laporan_page():
     st.markdown("<h1 class='main-header'>📊 Laporan & Statistik</h1>", unsafe_allow_html=True)
     
-    transactions_df = load_transactions_data()
-    products_df = load_products_data()
+    transactions_df = _current_transactions()
+    products_df = _current_products()
     
     if not transactions_df.empty:
         # Filter tanggal
+        # Default dihitung sekali; key membuat Streamlit memakai nilai tersimpan di rerun berikutnya
+        today = datetime.now().date()
         col1, col2, col3 = st.columns(3)
         with col1:
-            start_date = st.date_input("Dari Tanggal", value=datetime.now() - timedelta(days=7))
+            start_date = st.date_input("Dari Tanggal", value=today - timedelta(days=7), key="laporan_start")
         with col2:
-            end_date = st.date_input("Sampai Tanggal", value=datetime.now())
+            end_date = st.date_input("Sampai Tanggal", value=today, key="laporan_end")
         with col3:
             st.write("")
             st.write("")
-            if st.button("🔍 Filter", use_container_width=True):
-                st.rerun()
+            # Perubahan tanggal sudah memicu rerun; tombol cukup memicu rerun biasa
+            st.button("🔍 Filter", use_container_width=True)
         
         # Filter data
-        transactions_df['tanggal'] = pd.to_datetime(transactions_df['waktu']).dt.date
-        mask = (transactions_df['tanggal'] >= start_date) & (transactions_df['tanggal'] <= end_date)
-        filtered_df = transactions_df[mask]
+        filtered_df = _filter_period(transactions_df, start_date, end_date)
         
         if not filtered_df.empty:
+            report = _laporan_report(start_date, end_date, get_file_mtime(get_transactions_path()))
+            
             # Summary Statistics
             st.subheader("📈 Ringkasan Periode")
             col1, col2, col3, col4 = st.columns(4)
@@ -846,12 +1005,11 @@ def laporan_page():
             with col1:
                 st.metric("Total Transaksi", len(filtered_df))
             with col2:
-                st.metric("Total Pendapatan", format_currency(filtered_df['total_harga'].sum()))
+                st.metric("Total Pendapatan", format_currency(report['total_pendapatan']))
             with col3:
-                st.metric("Total Keuntungan", format_currency(filtered_df['keuntungan'].sum()))
+                st.metric("Total Keuntungan", format_currency(report['total_keuntungan']))
             with col4:
-                avg_transaction = filtered_df['total_harga'].mean()
-                st.metric("Rata-rata Transaksi", format_currency(avg_transaction))
+                st.metric("Rata-rata Transaksi", format_currency(report['rata_rata']))
             
             st.markdown("---")
             
@@ -859,20 +1017,24 @@ def laporan_page():
             tab1, tab2, tab3, tab4 = st.tabs(["📊 Penjualan", "💰 Keuntungan", "🏆 Produk Terlaris", "📋 Detail Transaksi"])
             
             with tab1:
-                fig = create_sales_chart(filtered_df)
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(report['sales'], use_container_width=True)
             
             with tab2:
-                fig = create_profit_chart(filtered_df)
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(report['profit'], use_container_width=True)
             
             with tab3:
-                fig = create_product_sales_chart(filtered_df)
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(report['product_sales'], use_container_width=True)
             
             with tab4:
-                st.dataframe(filtered_df.sort_values('waktu', ascending=False), 
-                           use_container_width=True, hide_index=True)
+                # Format Rupiah/tanggal dikerjakan browser hanya untuk baris yang terlihat
+                st.dataframe(filtered_df.iloc[::-1], 
+                           use_container_width=True, hide_index=True,
+                           column_config={
+                               'waktu': st.column_config.DatetimeColumn("waktu", format="YYYY-MM-DD HH:mm"),
+                               'harga_satuan': st.column_config.NumberColumn("harga_satuan", format="Rp %d"),
+                               'total_harga': st.column_config.NumberColumn("total_harga", format="Rp %d"),
+                               'keuntungan': st.column_config.NumberColumn("keuntungan", format="Rp %d")
+                           })
             
             # Export
             st.markdown("---")
@@ -882,6 +1044,10 @@ def laporan_page():
                     path = export_to_excel(filtered_df, "laporan_transaksi")
                     if path:
                         st.success(f"✅ Export berhasil: {path}")
+                if st.button("📄 Export ke CSV (lebih cepat)", use_container_width=True):
+                    path = export_to_csv(filtered_df, "laporan_transaksi")
+                    if path:
+                        st.success(f"✅ Export berhasil: {path}")
         else:
             st.warning("⚠️ Tidak ada transaksi pada periode yang dipilih")
     else:
@@ -923,12 +1089,22 @@ def settings_page():
         st.subheader("Daftar Backup")
         backup_folder = "data/backup"
         if os.path.exists(backup_folder):
-            files = os.listdir(backup_folder)
+            # Satu kali baca folder; mtime diambil dari DirEntry, bukan stat per file
+            with os.scandir(backup_folder) as entries:
+                files = [(entry.name, datetime.fromtimestamp(entry.stat().st_mtime))
+                         for entry in entries if entry.is_file()]
             if files:
-                for file in sorted(files, reverse=True):
-                    file_path = os.path.join(backup_folder, file)
-                    file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                    st.text(f"📄 {file} - {file_time.strftime('%Y-%m-%d %H:%M:%S')}")
+                # Satu tabel (virtualized di browser) menggantikan satu st.text per file
+                backup_df = pd.DataFrame(sorted(files, reverse=True), columns=['File', 'Waktu'])
+                st.dataframe(
+                    backup_df,
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={
+                        'File': st.column_config.TextColumn("📄 File"),
+                        'Waktu': st.column_config.DatetimeColumn("Waktu", format="YYYY-MM-DD HH:mm:ss")
+                    }
+                )
             else:
                 st.info("Belum ada backup")
         else:
@@ -938,8 +1114,8 @@ def settings_page():
     with tab2:
         st.subheader("Export Data ke Excel/CSV")
         
-        products_df = load_products_data()
-        transactions_df = load_transactions_data()
+        products_df = _current_products()
+        transactions_df = _current_transactions()
         
         col1, col2 = st.columns(2)
         
@@ -957,7 +1133,12 @@ def settings_page():
             if not transactions_df.empty:
                 st.write(f"Total: {len(transactions_df)} transaksi")
                 if st.button("📥 Export Transaksi (Excel)", use_container_width=True):
-                    path = export_to_excel(transactions_df, "transactions")
+                    # Riwayat panjang dipecah beberapa file agar tetap ringan dibuka di Excel
+                    paths = export_to_excel_parts(transactions_df, "transactions")
+                    if paths:
+                        st.success("✅ Export berhasil:\n" + "\n".join(f"- {path}" for path in paths))
+                if st.button("📄 Export Transaksi (CSV)", use_container_width=True):
+                    path = export_to_csv(transactions_df, "transactions")
                     if path:
                         st.success(f"✅ Export berhasil: {path}")
     
@@ -973,7 +1154,7 @@ def settings_page():
             - **Nama:** Kantin Sekolah Manager
             - **Versi:** 1.0.0 Enhanced
             - **Framework:** Streamlit
-            - **Database:** CSV (Offline)
+            - **Database:** CSV (produk) & Parquet (transaksi), Offline
             
             ### 🎯 Fitur Utama
             - ✅ CRUD Data Produk
@@ -997,8 +1178,8 @@ def settings_page():
             ### 📊 Statistik Aplikasi
             """)
             
-            products_df = load_products_data()
-            transactions_df = load_transactions_data()
+            products_df = _current_products()
+            transactions_df = _current_transactions()
             
             st.metric("Total Produk Terdaftar", len(products_df))
             st.metric("Total Transaksi", len(transactions_df))
@@ -1033,7 +1214,7 @@ def settings_page():
         **Dikembangkan dengan:**
         - ❤️ Python & Streamlit
         - 📚 Paradigma Pemrograman Terstruktur
-        - 🎯 100% Offline & CSV-based
+        - 🎯 100% Offline, berbasis file (CSV & Parquet)
         
         ---
         *© 2024 Kantin Sekolah Manager - All Rights Reserved*
@@ -1048,18 +1229,21 @@ def main():
         login_page()
         return
     
+    # Muat data sekali untuk sidebar dan halaman yang dibuka di rerun ini
+    st.session_state['_products_df'] = load_products_data()
+    st.session_state['_transactions_df'] = load_transactions_data()
+    
     # Sidebar
     with st.sidebar:
         st.title("🏪 Kantin Manager")
         st.write(f"👤 User: **{st.session_state.username}**")
         
         # Quick stats
-        products_df = load_products_data()
-        transactions_df = load_transactions_data()
+        products_df = _current_products()
         
         if not products_df.empty:
             st.metric("Produk", len(products_df), delta=None)
-            low_stock = len(products_df[products_df['stok'] < 10])
+            low_stock = count_low_stock(products_df['stok'])
             if low_stock > 0:
                 st.warning(f"⚠️ {low_stock} stok menipis")
         
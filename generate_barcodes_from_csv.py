@@ -13,8 +13,15 @@ import pandas as pd
 import os
 import barcode
 from barcode.writer import ImageWriter
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 
+# Class Code128 cukup dicari sekali saat import
+_CODE128 = barcode.get_barcode_class('code128')
+
+# ImageWriter dipakai ulang selama proses berjalan (satu per proses worker)
+_WRITER = {}
+
 def generate_single_barcode(barcode_id, product_name):
     """
     Generate single barcode
@@ -24,8 +31,9 @@ def generate_single_barcode(barcode_id, product_name):
         os.makedirs("barcodes", exist_ok=True)
         
         # Generate barcode Code128
-        code128 = barcode.get_barcode_class('code128')
-        barcode_instance = code128(barcode_id, writer=ImageWriter())
+        if not _WRITER:
+            _WRITER['writer'] = ImageWriter()
+        barcode_instance = _CODE128(barcode_id, writer=_WRITER['writer'])
         
         # Simpan barcode
         filename = f"barcodes/{barcode_id}"
@@ -42,6 +50,11 @@ def generate_single_barcode(barcode_id, product_name):
             'error': str(e)
         }
 
+def _generate_item(item):
+    """Wrapper generate_single_barcode untuk ProcessPoolExecutor.map."""
+    barcode_id, product_name = item
+    return barcode_id, generate_single_barcode(barcode_id, product_name)
+
 def check_existing_barcode(barcode_id):
     """
     Check if barcode already exists
@@ -90,11 +103,12 @@ def generate_barcodes_from_csv(csv_path="data/products.csv", skip_existing=True)
     to_generate = []
     
     print("🔍 Checking existing barcodes...")
-    for idx, row in df.iterrows():
-        if check_existing_barcode(row['barcode_id']):
+    all_items = list(zip(df['barcode_id'].tolist(), df['nama_produk'].tolist()))
+    for item in all_items:
+        if check_existing_barcode(item[0]):
             existing_count += 1
         else:
-            to_generate.append(row)
+            to_generate.append(item)
     
     print(f"\n📊 Status:")
     print(f"   Total Produk: {total_products}")
@@ -112,7 +126,7 @@ def generate_barcodes_from_csv(csv_path="data/products.csv", skip_existing=True)
     if not skip_existing:
         response = input(f"\n⚠️  Generate ulang {existing_count} barcode yang sudah ada? (y/n): ")
         if response.lower() == 'y':
-            to_generate = df.to_dict('records')
+            to_generate = all_items
     
     # Generate barcodes
     print(f"\n🚀 Memulai generate {len(to_generate)} barcode...")
@@ -121,17 +135,21 @@ def generate_barcodes_from_csv(csv_path="data/products.csv", skip_existing=True)
     success_count = 0
     failed_items = []
     
-    # Progress bar
-    for item in tqdm(to_generate, desc="Generating", unit="barcode"):
-        result = generate_single_barcode(item['barcode_id'], item['nama_produk'])
+    # Render PNG murni CPU, jadi dibagi ke beberapa proses
+    os.makedirs("barcodes", exist_ok=True)
+    workers = max(1, min(os.cpu_count() or 1, len(to_generate)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_generate_item, to_generate, chunksize=16)
         
-        if result['success']:
-            success_count += 1
-        else:
-            failed_items.append({
-                'barcode_id': item['barcode_id'],
-                'error': result['error']
-            })
+        # Progress bar
+        for barcode_id, result in tqdm(results, total=len(to_generate), desc="Generating", unit="barcode"):
+            if result['success']:
+                success_count += 1
+            else:
+                failed_items.append({
+                    'barcode_id': barcode_id,
+                    'error': result['error']
+                })
     
     # Summary
     print()
@@ -6,73 +6,63 @@ Berisi fungsi-fungsi CRUD, Barcode, Chart, dan Utilities
 __version__ = "1.0.0"
 __author__ = "Tim Proyek Kantin Sekolah"
 
-# Import fungsi utama untuk memudahkan akses
-from .data_handler import (
-    load_products_data,
-    save_products_data,
-    load_transactions_data,
-    save_transactions_data,
-    add_product,
-    update_product,
-    delete_product,
-    get_product_by_barcode,
-    search_product,
-    reduce_stock,
-    add_stock
-)
+import importlib
 
-from .barcode_handler import (
-    generate_barcode,
-    scan_barcode_from_camera,
-    scan_barcode_from_image,
-    validate_barcode_format
-)
+# Fungsi utama per submodule. Submodule baru di-import saat fungsinya pertama
+# diakses (PEP 562), jadi plotly/opencv/scanner tidak ikut dimuat saat start
+# jika halaman terkait tidak pernah dibuka.
+_LAZY_EXPORTS = {
+    'data_handler': (
+        'load_products_data',
+        'load_products_indexed',
+        'save_products_data',
+        'load_transactions_data',
+        'save_transactions_data',
+        'add_product',
+        'update_product',
+        'delete_product',
+        'get_product_by_barcode',
+        'search_product',
+        'reduce_stock',
+        'add_stock',
+    ),
+    'barcode_handler': (
+        'generate_barcode',
+        'scan_barcode_from_camera',
+        'scan_barcode_from_image',
+        'validate_barcode_format',
+    ),
+    'chart_handler': (
+        'create_stock_chart',
+        'create_sales_chart',
+        'create_profit_chart',
+        'calculate_statistics',
+    ),
+    'utils': (
+        'validate_number',
+        'validate_not_empty',
+        'format_currency',
+        'create_backup',
+        'export_to_excel',
+    ),
+}
 
-from .chart_handler import (
-    create_stock_chart,
-    create_sales_chart,
-    create_profit_chart,
-    calculate_statistics
-)
+_EXPORT_MODULE = {
+    name: module_name
+    for module_name, names in _LAZY_EXPORTS.items()
+    for name in names
+}
 
-from .utils import (
-    validate_number,
-    validate_not_empty,
-    format_currency,
-    create_backup,
-    export_to_excel
-)
+__all__ = list(_EXPORT_MODULE)
 
-__all__ = [
-    # Data Handler
-    'load_products_data',
-    'save_products_data',
-    'load_transactions_data',
-    'save_transactions_data',
-    'add_product',
-    'update_product',
-    'delete_product',
-    'get_product_by_barcode',
-    'search_product',
-    'reduce_stock',
-    'add_stock',
-    
-    # Barcode Handler
-    'generate_barcode',
-    'scan_barcode_from_camera',
-    'scan_barcode_from_image',
-    'validate_barcode_format',
-    
-    # Chart Handler
-    'create_stock_chart',
-    'create_sales_chart',
-    'create_profit_chart',
-    'calculate_statistics',
-    
-    # Utils
-    'validate_number',
-    'validate_not_empty',
-    'format_currency',
-    'create_backup',
-    'export_to_excel'
-]
\ No newline at end of file
+def __getattr__(name):
+    """Import submodule pemilik fungsi saat fungsi pertama kali diakses"""
+    module_name = _EXPORT_MODULE.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # akses berikutnya tidak lewat __getattr__ lagi
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
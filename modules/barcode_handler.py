@@ -3,11 +3,20 @@ Module untuk menangani generate dan scan barcode
 VERSI STREAMLIT NATIVE - Preview di Browser
 """
 
-import barcode
 from barcode.writer import ImageWriter
+import multiprocessing
 import os
+import sys
 import streamlit as st
+import tempfile
 import time
+import threading
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .barcode_render import render_barcode, render_batch_item
+from .utils import ensure_directory
 
 # Import OpenCV dengan error handling
 OPENCV_AVAILABLE = False
@@ -19,58 +28,122 @@ try:
 except ImportError as e:
     print(f"⚠️ OpenCV not available: {e}")
 
+# Numba opsional untuk kernel penggelapan overlay preview
+NUMBA_AVAILABLE = False
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    pass
+
 # Try multiple barcode scanning options
 SCANNER_METHOD = None
 SCANNER_ERROR_MESSAGE = ""
 
-# Option 1: Try pyzxing
+# Option 0: zxing-cpp (ZXing native C++, decode langsung dari array numpy)
 try:
-    from pyzxing import BarCodeReader
-    reader = BarCodeReader()
-    SCANNER_METHOD = "pyzxing"
-    print("✅ Pyzxing barcode scanner initialized")
-except Exception as e:
-    print(f"⚠️ Pyzxing not available: {e}")
-    SCANNER_ERROR_MESSAGE = str(e)
-    
-    # Option 2: Try pyzbar as fallback
+    import zxingcpp
+    SCANNER_METHOD = "zxingcpp"
+    print("✅ zxing-cpp barcode scanner initialized")
+except ImportError:
+    print("⚠️ zxing-cpp not available")
+
+# Option 1: Try pyzxing
+if SCANNER_METHOD is None:
+    try:
+        from pyzxing import BarCodeReader
+        reader = BarCodeReader()
+        SCANNER_METHOD = "pyzxing"
+        print("✅ Pyzxing barcode scanner initialized")
+    except Exception as e:
+        print(f"⚠️ Pyzxing not available: {e}")
+        SCANNER_ERROR_MESSAGE = str(e)
+        
+        # Option 2: Try pyzbar as fallback
+        try:
+            from pyzbar.pyzbar import decode, ZBarSymbol
+            SCANNER_METHOD = "pyzbar"
+            print("✅ Pyzbar barcode scanner initialized (fallback)")
+        except ImportError:
+            print("⚠️ Pyzbar also not available")
+            SCANNER_METHOD = None
+
+# pyzxing menjalankan `java -jar` per decode (start JVM ratusan ms tiap scan).
+# Dengan jpype, JVM dijalankan sekali dan ZXing dipanggil langsung dari memori.
+ZXING_JVM = None
+if SCANNER_METHOD == "pyzxing":
     try:
-        from pyzbar.pyzbar import decode
-        SCANNER_METHOD = "pyzbar"
-        print("✅ Pyzbar barcode scanner initialized (fallback)")
-    except ImportError:
-        print("⚠️ Pyzbar also not available")
-        SCANNER_METHOD = None
+        import jpype
+        if not jpype.isJVMStarted():
+            jpype.startJVM(classpath=[reader.lib_path])
+        ZXING_JVM = {
+            'reader': jpype.JClass('com.google.zxing.MultiFormatReader')(),
+            'source': jpype.JClass('com.google.zxing.PlanarYUVLuminanceSource'),
+            'binarizer': jpype.JClass('com.google.zxing.common.HybridBinarizer'),
+            'bitmap': jpype.JClass('com.google.zxing.BinaryBitmap'),
+            'bytes': jpype.JArray(jpype.JByte),
+            'error': jpype.JClass('com.google.zxing.ReaderException'),
+        }
+        print("✅ ZXing JVM persistent (jpype) aktif")
+    except Exception as e:
+        print(f"⚠️ jpype tidak tersedia, pyzxing akan start JVM tiap scan: {e}")
+        # pyzbar (C, in-process) jauh lebih cepat dari pyzxing via subprocess
+        try:
+            from pyzbar.pyzbar import decode, ZBarSymbol
+            SCANNER_METHOD = "pyzbar"
+            print("✅ Pyzbar dipakai menggantikan pyzxing subprocess")
+        except (ImportError, OSError) as e:
+            # DLL ZBar tidak ada (Windows) -> FileNotFoundError/OSError: tetap pakai pyzxing
+            print(f"⚠️ Pyzbar tidak bisa dimuat, tetap memakai pyzxing: {e}")
 
 WEBCAM_AVAILABLE = OPENCV_AVAILABLE and SCANNER_METHOD is not None
 
+# Aplikasi hanya mencetak CODE128: pyzbar tidak perlu mencoba EAN/QR/PDF417/dll
+PYZBAR_SYMBOLS = [ZBarSymbol.CODE128] if SCANNER_METHOD == "pyzbar" else None
+
 # ==================== FUNGSI GENERATE BARCODE ====================
 
 def generate_barcode(barcode_id, product_name):
     """Fungsi untuk generate barcode image"""
     try:
-        os.makedirs("barcodes", exist_ok=True)
-        code128 = barcode.get_barcode_class('code128')
-        barcode_instance = code128(barcode_id, writer=ImageWriter())
-        filename = f"barcodes/{barcode_id}"
-        full_path = barcode_instance.save(filename)
-        return full_path
+        ensure_directory("barcodes")
+        return render_barcode(barcode_id, ImageWriter())
     except Exception as e:
         print(f"Error generating barcode: {e}")
         return None
 
+# Di bawah jumlah ini batch dikerjakan serial (biaya start proses > biaya render)
+BATCH_PARALLEL_MIN = 32
+BATCH_ITEMS_PER_WORKER = 16
+_SPAWN_CONTEXT = multiprocessing.get_context("spawn")
+
 def generate_batch_barcodes(products_df):
     """Fungsi untuk generate barcode secara batch"""
     try:
-        success_count = 0
-        failed_items = []
+        # Dua kolom langsung di-zip: tanpa objek baris per produk, pickle ke worker ringan
+        items = list(zip(products_df['barcode_id'].tolist(), products_df['nama_produk'].tolist()))
+        ensure_directory("barcodes")
+        # Tiap proses minimal dapat BATCH_ITEMS_PER_WORKER produk agar biaya start proses tertutup
+        workers = min(os.cpu_count() or 1, -(-len(items) // BATCH_ITEMS_PER_WORKER))
+        results = None
         
-        for index, row in products_df.iterrows():
-            result = generate_barcode(row['barcode_id'], row['nama_produk'])
-            if result:
-                success_count += 1
-            else:
-                failed_items.append(row['barcode_id'])
+        # Render + encode PNG per produk independen -> bagi ke beberapa proses. Worker selalu
+        # di-spawn (bukan fork proses yang mungkin sudah memegang JVM/thread kamera) dan hanya
+        # meng-import modules.barcode_render, tanpa setup scanner/JVM/streamlit modul ini
+        if len(items) >= BATCH_PARALLEL_MIN and workers > 1:
+            chunksize = max(1, len(items) // (4 * workers))
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=_SPAWN_CONTEXT) as executor:
+                    results = list(executor.map(render_batch_item, items, chunksize=chunksize))
+            except Exception as e:
+                print(f"⚠️ Batch paralel gagal, lanjut serial: {e}")
+                results = None
+        
+        if results is None:
+            results = [render_batch_item(item) for item in items]
+        
+        failed_items = [barcode_id for barcode_id, ok in results if not ok]
+        success_count = len(results) - len(failed_items)
         
         return {
             'success': True,
@@ -87,76 +160,113 @@ def generate_batch_barcodes(products_df):
 
 # ==================== HELPER FUNCTIONS FOR UI ====================
 
-def draw_scan_frame(frame, status="scanning", message="Arahkan barcode ke area hijau"):
-    """
-    Menggambar frame UI untuk scanning dengan overlay
-    """
-    height, width = frame.shape[:2]
-    
-    # Status color
-    if status == "scanning":
-        color = (0, 255, 0)  # Green
-        box_color = (0, 255, 0)
-    elif status == "detected":
-        color = (0, 255, 0)  # Green
-        box_color = (0, 255, 0)
-    else:  # error
-        color = (0, 0, 255)  # Red
-        box_color = (0, 0, 255)
-    
-    # Draw scan area (center rectangle)
+# Kualitas JPEG frame scan untuk pyzxing (cukup untuk decode, file jauh lebih kecil)
+SCAN_JPEG_QUALITY = 70
+
+# Deteksi gerakan: decode hanya saat area scan diam (beda rata-rata < threshold)
+MOTION_SIZE = (80, 60)
+MOTION_THRESHOLD = 8.0
+MOTION_FORCE_SCAN_FRAMES = 30  # tetap decode paling lambat tiap 30 frame
+DUPLICATE_THRESHOLD = 1.5  # di bawah ini frame dianggap sama dengan frame yang gagal di-decode
+
+# Interval decode adaptif: decode makan <= ~80% budget frame (30 FPS), 1..15 frame
+FRAME_BUDGET_MS = 33.0
+SCAN_INTERVAL_MAX = 15
+
+# Resolusi kamera: 640x480 cukup untuk CODE128 di kotak scan, piksel ~3x lebih sedikit dari 720p
+CAMERA_WIDTH = 640
+CAMERA_HEIGHT = 480
+
+# Area scan diperkecil ke lebar maksimum ini sebelum decode (modul CODE128 tetap >= 2 px);
+# sesekali dicoba resolusi penuh
+DECODE_MAX_WIDTH = 384
+FULLRES_RETRY_MISSES = 5
+
+@lru_cache(maxsize=8)
+def _scan_area(width, height):
+    """Kotak scan di tengah frame (60% x 40%), return (scan_x, scan_y, scan_width, scan_height)"""
     scan_width = int(width * 0.6)
     scan_height = int(height * 0.4)
-    scan_x = (width - scan_width) // 2
-    scan_y = (height - scan_height) // 2
+    return (width - scan_width) // 2, (height - scan_height) // 2, scan_width, scan_height
+
+def _scan_temp_path():
+    """Path file frame sementara untuk pyzxing, di RAM disk (/dev/shm) jika tersedia"""
+    folder = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(folder, f"kantin_scan_{os.getpid()}.jpg")
+
+# Cache elemen statis draw_scan_frame: (width, height, status) -> (layer, mask)
+_SCAN_OVERLAY_CACHE = {}
+# Layer terakhir yang sudah berisi pesan; pesan jarang berubah antar frame
+_SCAN_MESSAGE_LAYER = {'key': None, 'layer': None, 'mask': None, 'bands': None}
+
+def _status_colors(status):
+    """Warna teks dan kotak scan per status, return (color, box_color)"""
+    if status in ("scanning", "detected"):
+        return (0, 255, 0), (0, 255, 0)  # Green
+    return (0, 0, 255), (0, 0, 255)  # Red (error)
+
+if NUMBA_AVAILABLE and OPENCV_AVAILABLE:
+    # Signature eksplisit: dikompilasi saat import, cache=True menyimpan hasilnya di disk;
+    # nogil supaya thread grabber & decode tetap jalan selama frame digelapkan.
+    # Sengaja serial (tanpa parallel=True): modul ini di-import dari thread script Streamlit,
+    # dan kernel parallel yang dikompilasi di luar main thread (threading layer workqueue)
+    # membuat interpreter tidak bisa exit. Satu frame 640x480 tidak butuh thread pool.
+    @njit("void(uint8[:, :, ::1], int64, int64, int64, int64, float64)",
+          fastmath=True, cache=True, nogil=True)
+    def _darken_outside(frame, x0, y0, x1, y1, alpha):
+        """Gelapkan in-place semua piksel di luar kotak [x0, x1) x [y0, y1)"""
+        height, width, channels = frame.shape
+        for y in range(height):
+            inside_y = y0 <= y < y1
+            for x in range(width):
+                if inside_y and x0 <= x < x1:
+                    continue
+                for c in range(channels):
+                    frame[y, x, c] = np.uint8(frame[y, x, c] * alpha + 0.5)
+else:
+    _darken_outside = None
+
+def _corner_brackets(x0, y0, x1, y1, length):
+    """Titik 4 siku sudut kotak (x0, y0)-(x1, y1) untuk satu panggilan cv2.polylines"""
+    return [np.array(points, dtype=np.int32).reshape(-1, 1, 2) for points in (
+        [(x0 + length, y0), (x0, y0), (x0, y0 + length)],
+        [(x1 - length, y0), (x1, y0), (x1, y0 + length)],
+        [(x0 + length, y1), (x0, y1), (x0, y1 - length)],
+        [(x1 - length, y1), (x1, y1), (x1, y1 - length)],
+    )]
+
+def _draw_scan_chrome(img, width, height, status):
+    """Gambar elemen statis scan UI (sudut, scan line, banner, info bar) ke img"""
+    color, box_color = _status_colors(status)
+    scan_x, scan_y, scan_width, scan_height = _scan_area(width, height)
     
     # Draw corner markers
     corner_length = 30
     corner_thickness = 3
     
-    # Top-left corner
-    cv2.line(frame, (scan_x, scan_y), (scan_x + corner_length, scan_y), box_color, corner_thickness)
-    cv2.line(frame, (scan_x, scan_y), (scan_x, scan_y + corner_length), box_color, corner_thickness)
+    # Catatan tampilan (sengaja beda dari versi lama yang menggambar 8 cv2.line lalu
+    # menggelapkan frame): garis vertikal siku kiri-bawah dulu salah arah (menjulur sampai
+    # dekat sudut kiri-atas) dan sekarang sependek siku lain; sambungan siku berupa polyline;
+    # siku ada di layer overlay sehingga tidak ikut digelapkan (~0.4% piksel berubah)
+    brackets = _corner_brackets(scan_x, scan_y, scan_x + scan_width, scan_y + scan_height, corner_length)
+    cv2.polylines(img, brackets, False, box_color, corner_thickness)
     
-    # Top-right corner
-    cv2.line(frame, (scan_x + scan_width, scan_y), (scan_x + scan_width - corner_length, scan_y), box_color, corner_thickness)
-    cv2.line(frame, (scan_x + scan_width, scan_y), (scan_x + scan_width, scan_y + corner_length), box_color, corner_thickness)
-    
-    # Bottom-left corner
-    cv2.line(frame, (scan_x, scan_y + scan_height), (scan_x + corner_length, scan_y + scan_height), box_color, corner_thickness)
-    cv2.line(frame, (scan_x, scan_y + scan_height), (scan_x, scan_y + corner_length), box_color, corner_thickness)
-    
-    # Bottom-right corner
-    cv2.line(frame, (scan_x + scan_width, scan_y + scan_height), (scan_x + scan_width - corner_length, scan_y + scan_height), box_color, corner_thickness)
-    cv2.line(frame, (scan_x + scan_width, scan_y + scan_height), (scan_x + scan_width, scan_y + scan_height - corner_length), box_color, corner_thickness)
-    
-    # Draw scanning line animation
+    # Draw scanning line
     scan_line_y = scan_y + (scan_height // 2)
-    cv2.line(frame, (scan_x, scan_line_y), (scan_x + scan_width, scan_line_y), (0, 255, 255), 2)
-    
-    # Dark overlay outside scan area
-    mask = np.zeros((height, width), dtype=np.uint8)
-    cv2.rectangle(mask, (scan_x, scan_y), (scan_x + scan_width, scan_y + scan_height), 255, -1)
-    mask_inv = cv2.bitwise_not(mask)
-    
-    frame_dark = frame.copy()
-    frame_dark = cv2.addWeighted(frame_dark, 0.3, frame_dark, 0, 0)
-    frame = np.where(mask_inv[:, :, np.newaxis] == 255, frame_dark, frame)
+    cv2.line(img, (scan_x, scan_line_y), (scan_x + scan_width, scan_line_y), (0, 255, 255), 2)
     
     # Draw top banner
     banner_height = 80
-    cv2.rectangle(frame, (0, 0), (width, banner_height), (0, 0, 0), -1)
-    cv2.rectangle(frame, (0, 0), (width, banner_height), color, 3)
+    cv2.rectangle(img, (0, 0), (width, banner_height), (0, 0, 0), -1)
+    cv2.rectangle(img, (0, 0), (width, banner_height), color, 3)
     
-    cv2.putText(frame, "BARCODE SCANNER - REAL TIME", 
+    cv2.putText(img, "BARCODE SCANNER - REAL TIME", 
                (20, 35), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-    cv2.putText(frame, message, 
-               (20, 65), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
     
     # Draw bottom info bar
     info_y = height - 100
-    cv2.rectangle(frame, (0, info_y), (width, height), (0, 0, 0), -1)
-    cv2.rectangle(frame, (0, info_y), (width, height), (100, 100, 100), 2)
+    cv2.rectangle(img, (0, info_y), (width, height), (0, 0, 0), -1)
+    cv2.rectangle(img, (0, info_y), (width, height), (100, 100, 100), 2)
     
     instructions = [
         ("Scanner:", f"{SCANNER_METHOD.upper() if SCANNER_METHOD else 'N/A'}", (20, info_y + 25)),
@@ -165,8 +275,82 @@ def draw_scan_frame(frame, status="scanning", message="Arahkan barcode ke area h
     ]
     
     for label, value, pos in instructions:
-        cv2.putText(frame, f"{label} {value}", pos, 
+        cv2.putText(img, f"{label} {value}", pos, 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+
+def _painted_mask(layer, probe):
+    """Mask uint8 piksel yang sama di render latar hitam & putih (= piksel yang digambar)"""
+    return np.all(layer == probe, axis=2).astype(np.uint8)
+
+def _opaque_bands(mask):
+    """Batas baris yang tertutup penuh di atas & bawah mask, return (top, bottom)"""
+    full = mask.all(axis=1)
+    if full.all():
+        return len(full), len(full)
+    return int(np.argmin(full)), len(full) - int(np.argmin(full[::-1]))
+
+def _scan_overlay(width, height, status):
+    """Layer elemen statis + mask piksel yang digambar, dirender sekali per ukuran & status"""
+    key = (width, height, status)
+    cached = _SCAN_OVERLAY_CACHE.get(key)
+    if cached is None:
+        # Render di atas latar hitam dan putih: piksel yang sama di keduanya = digambar
+        layer = np.zeros((height, width, 3), dtype=np.uint8)
+        probe = np.full((height, width, 3), 255, dtype=np.uint8)
+        _draw_scan_chrome(layer, width, height, status)
+        _draw_scan_chrome(probe, width, height, status)
+        cached = _SCAN_OVERLAY_CACHE[key] = (layer, _painted_mask(layer, probe))
+    return cached
+
+def _scan_message_overlay(width, height, status, message):
+    """Layer statis + teks pesan, dirender ulang hanya saat status/pesan berubah"""
+    key = (width, height, status, message)
+    if _SCAN_MESSAGE_LAYER['key'] != key:
+        color, _ = _status_colors(status)
+        base, base_mask = _scan_overlay(width, height, status)
+        layer = base.copy()
+        probe = np.where(base_mask[:, :, np.newaxis] > 0, base, np.uint8(255))
+        for img in (layer, probe):
+            cv2.putText(img, message, 
+                       (20, 65), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        mask = _painted_mask(layer, probe)
+        _SCAN_MESSAGE_LAYER.update(key=key, layer=layer, mask=mask, bands=_opaque_bands(mask))
+    top, bottom = _SCAN_MESSAGE_LAYER['bands']
+    return _SCAN_MESSAGE_LAYER['layer'], _SCAN_MESSAGE_LAYER['mask'], top, bottom
+
+def draw_scan_frame(frame, status="scanning", message="Arahkan barcode ke area hijau"):
+    """
+    Menggambar frame UI untuk scanning dengan overlay
+    """
+    height, width = frame.shape[:2]
+    scan_x, scan_y, scan_width, scan_height = _scan_area(width, height)
+    
+    layer, mask, top, bottom = _scan_message_overlay(width, height, status, message)
+    
+    # Banner atas & info bar bawah menutup baris penuh: salin langsung (tanpa mask),
+    # dan baris itu tidak perlu ikut digelapkan
+    frame[:top] = layer[:top]
+    frame[bottom:] = layer[bottom:]
+    middle = frame[top:bottom]
+    
+    # Dark overlay outside scan area: gelapkan in-place (30%) hanya 4 strip di
+    # sekitar kotak scan (atas, bawah, kiri, kanan); batas kotak tetap terang
+    box_top = max(scan_y - top, 0)
+    box_bottom = max(scan_y + scan_height + 1 - top, 0)
+    box_right = scan_x + scan_width + 1
+    if _darken_outside is not None and middle.flags.c_contiguous:
+        # Satu pass serial (kernel Numba nogil) atas seluruh area, hasil sama dengan 4 strip di bawah
+        _darken_outside(middle, scan_x, box_top, box_right, box_bottom, 0.3)
+    else:
+        for strip in (middle[:box_top], middle[box_bottom:],
+                      middle[box_top:box_bottom, :scan_x], middle[box_top:box_bottom, box_right:]):
+            cv2.convertScaleAbs(strip, dst=strip, alpha=0.3)
+    
+    # Sisa elemen (sudut, scan line) ditempel dengan masked copy
+    if hasattr(cv2, 'copyTo'):
+        cv2.copyTo(layer[top:bottom], mask[top:bottom], middle)
+    else:
+        np.copyto(middle, layer[top:bottom], where=mask[top:bottom, :, np.newaxis].astype(bool))
     
     return frame
 
@@ -195,19 +379,23 @@ def draw_detected_barcode(frame, barcode_data, barcode_rect=None):
         
         corner_len = 20
         # Corners
-        cv2.line(frame, (x-10, y-10), (x-10+corner_len, y-10), (0, 255, 0), 5)
-        cv2.line(frame, (x-10, y-10), (x-10, y-10+corner_len), (0, 255, 0), 5)
-        cv2.line(frame, (x+w+10, y-10), (x+w+10-corner_len, y-10), (0, 255, 0), 5)
-        cv2.line(frame, (x+w+10, y-10), (x+w+10, y-10+corner_len), (0, 255, 0), 5)
-        cv2.line(frame, (x-10, y+h+10), (x-10+corner_len, y+h+10), (0, 255, 0), 5)
-        cv2.line(frame, (x-10, y+h+10), (x-10, y+h+10-corner_len), (0, 255, 0), 5)
-        cv2.line(frame, (x+w+10, y+h+10), (x+w+10-corner_len, y+h+10), (0, 255, 0), 5)
-        cv2.line(frame, (x+w+10, y+h+10), (x+w+10, y+h+10-corner_len), (0, 255, 0), 5)
+        cv2.polylines(frame, _corner_brackets(x-10, y-10, x+w+10, y+h+10, corner_len), False, (0, 255, 0), 5)
     
     return frame
 
 # ==================== STREAMLIT NATIVE CAMERA SCANNER ====================
 
+# Foto dari HP bisa 4000 px; akurasi decode sudah jenuh jauh di bawah itu
+PHOTO_MAX_WIDTH = 1600
+
+def _downscale_for_decode(image, max_width=PHOTO_MAX_WIDTH):
+    """Perkecil gambar ke lebar maksimum max_width (INTER_AREA) sebelum di-decode"""
+    width = image.shape[1]
+    if width <= max_width:
+        return image
+    scale = max_width / width
+    return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
 def scan_barcode_from_camera_streamlit():
     """
     Fungsi untuk scan barcode dengan preview di Streamlit
@@ -245,10 +433,7 @@ def scan_barcode_from_camera_streamlit():
         camera_photo = st.camera_input("Arahkan kamera ke barcode, lalu klik 'Take Photo'")
         
         if camera_photo is not None:
-            # Save temporary image
-            temp_path = "temp_camera_capture.jpg"
-            with open(temp_path, "wb") as f:
-                f.write(camera_photo.getbuffer())
+            photo_bytes = camera_photo.getbuffer()
             
             st.image(camera_photo, caption="Foto yang diambil", width=400)
             
@@ -256,15 +441,45 @@ def scan_barcode_from_camera_streamlit():
                 # Scan barcode dari foto
                 if SCANNER_METHOD == "pyzxing":
                     try:
-                        results = reader.decode(temp_path)
+                        # pyzxing hanya menerima path: tulis ke tmpfs (RAM), bukan ke disk
+                        folder = "/dev/shm" if os.path.isdir("/dev/shm") else None
+                        with tempfile.NamedTemporaryFile(dir=folder, suffix=".jpg", delete=False) as f:
+                            image = None
+                            if OPENCV_AVAILABLE:
+                                image = cv2.imdecode(np.frombuffer(photo_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+                            if image is not None and image.shape[1] > PHOTO_MAX_WIDTH:
+                                # Foto besar: kirim versi kecil ke JVM (decode JPEG-nya jauh lebih ringan)
+                                ok, jpeg = cv2.imencode('.jpg', _downscale_for_decode(image))
+                                f.write(jpeg.data if ok else photo_bytes)
+                            else:
+                                f.write(photo_bytes)
+                            temp_path = f.name
+                        try:
+                            results = reader.decode(temp_path)
+                        finally:
+                            os.remove(temp_path)
                         
                         if results and len(results) > 0:
                             barcode_data = results[0].get('parsed', None)
                             if barcode_data:
-                                # Cleanup
-                                if os.path.exists(temp_path):
-                                    os.remove(temp_path)
-                                
+                                return {
+                                    'success': True,
+                                    'barcode_id': barcode_data,
+                                    'message': f"✅ Barcode berhasil di-scan: {barcode_data}"
+                                }
+                    except Exception as e:
+                        st.error(f"Error scanning: {e}")
+                
+                elif SCANNER_METHOD == "zxingcpp":
+                    try:
+                        # Decode JPEG langsung dari buffer upload (tanpa file sementara) ke
+                        # grayscale: 1 channel untuk downscale & decoder
+                        image = cv2.imdecode(np.frombuffer(photo_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+                        if image is not None:
+                            image = _downscale_for_decode(image)
+                            barcode_data, _ = _decode_zxingcpp(image)
+                            
+                            if barcode_data:
                                 return {
                                     'success': True,
                                     'barcode_id': barcode_data,
@@ -275,17 +490,15 @@ def scan_barcode_from_camera_streamlit():
                 
                 elif SCANNER_METHOD == "pyzbar":
                     try:
-                        image = cv2.imread(temp_path)
+                        # Langsung decode JPEG ke grayscale: 1 channel untuk downscale & decoder
+                        image = cv2.imdecode(np.frombuffer(photo_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
                         if image is not None:
-                            decoded_objects = decode(image)
+                            image = _downscale_for_decode(image)
+                            decoded_objects = decode(image, symbols=PYZBAR_SYMBOLS)
                             
                             if decoded_objects:
                                 barcode_data = decoded_objects[0].data.decode('utf-8')
                                 
-                                # Cleanup
-                                if os.path.exists(temp_path):
-                                    os.remove(temp_path)
-                                
                                 return {
                                     'success': True,
                                     'barcode_id': barcode_data,
@@ -294,10 +507,6 @@ def scan_barcode_from_camera_streamlit():
                     except Exception as e:
                         st.error(f"Error scanning: {e}")
                 
-                # Cleanup jika gagal
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                
                 st.warning("⚠️ Tidak ada barcode yang terdeteksi. Coba ambil foto lagi dengan kondisi:")
                 st.markdown("""
                 - ✅ Barcode jelas dan fokus
@@ -317,6 +526,218 @@ def scan_barcode_from_camera_streamlit():
             'message': f"❌ Error: {str(e)}\n\nGunakan 'Input Manual Barcode' sebagai alternatif."
         }
 
+# ==================== FRAME GRABBER THREAD ====================
+
+def _open_camera(index=0):
+    """Buka kamera dengan backend native (MJPEG & BUFFERSIZE dihormati), fallback ke default"""
+    if sys.platform.startswith("win"):
+        backend = cv2.CAP_DSHOW  # MSMF (default Windows) mengabaikan CAP_PROP_BUFFERSIZE
+    elif sys.platform.startswith("linux"):
+        backend = cv2.CAP_V4L2
+    else:
+        backend = None
+    
+    if backend is not None:
+        cap = cv2.VideoCapture(index, backend)
+        if cap.isOpened():
+            return cap
+        cap.release()
+    return cv2.VideoCapture(index)
+
+def _new_frame_slot():
+    """Slot satu frame terbaru yang dibagi thread grabber dan loop preview"""
+    return {'frame': None, 'seq': 0, 'taken': True, 'ended': False, 'cond': threading.Condition()}
+
+def _grab_frames(cap, slot, stop_event):
+    """Thread grabber: baca kamera terus-menerus, simpan hanya frame terbaru (sudah di-mirror)"""
+    cond = slot['cond']
+    while not stop_event.is_set():
+        # grab() memajukan kamera tanpa decode; retrieve() (decode MJPEG/YUYV) hanya
+        # jika loop preview sudah mengambil frame sebelumnya -> frame yang tidak akan
+        # pernah ditampilkan tidak ikut di-decode
+        ret = cap.grab()
+        if ret:
+            with cond:
+                wanted = slot['taken']
+            if not wanted:
+                continue
+            ret, frame = cap.retrieve()
+        if ret:
+            # Mirror in-place di thread ini; retrieve() memberi array baru tiap frame,
+            # jadi frame yang sudah dipublikasikan tidak pernah diubah lagi oleh grabber
+            cv2.flip(frame, 1, dst=frame)
+        with cond:
+            if not ret:
+                slot['ended'] = True
+                cond.notify_all()
+                break
+            slot['frame'] = frame
+            slot['seq'] += 1
+            slot['taken'] = False
+            cond.notify_all()
+
+def _wait_frame(slot, last_seq, timeout=1.0):
+    """Tunggu frame yang lebih baru dari last_seq, return (frame, seq) atau (None, seq)"""
+    cond = slot['cond']
+    with cond:
+        cond.wait_for(lambda: slot['seq'] != last_seq or slot['ended'], timeout)
+        if slot['seq'] == last_seq:
+            return None, last_seq
+        slot['taken'] = True
+        return slot['frame'], slot['seq']
+
+# ==================== DECODE WORKER ====================
+
+# Satu worker decode yang dipakai ulang antar sesi scan (dibuat saat pertama dipakai)
+_SCAN_POOL = {}
+_SCAN_POOL_LOCK = threading.Lock()
+
+def _scan_pool():
+    """Ambil ThreadPoolExecutor decode (1 worker), buat jika belum ada"""
+    with _SCAN_POOL_LOCK:
+        if 'executor' not in _SCAN_POOL:
+            _SCAN_POOL['executor'] = ThreadPoolExecutor(max_workers=1, thread_name_prefix="barcode-decode")
+        return _SCAN_POOL['executor']
+
+# cv2.barcode hanya dipakai untuk MENCARI lokasi barcode: decoder-nya (4.9) cuma membaca
+# EAN/UPC, sedangkan aplikasi ini mencetak CODE128. Decoder aktif cukup membaca potongan
+# tegak di sekitar barcode, bukan seluruh area scan
+_ROI_DETECTOR = None
+if OPENCV_AVAILABLE and SCANNER_METHOD is not None and hasattr(cv2, 'barcode'):
+    try:
+        _ROI_DETECTOR = cv2.barcode.BarcodeDetector()
+    except Exception as e:
+        print(f"⚠️ OpenCV barcode detector (ROI) not available: {e}")
+
+# Margin di sekitar kotak deteksi agar quiet zone CODE128 ikut terpotong
+ROI_PAD_RATIO = 0.15
+ROI_PAD_PX = 8
+
+# Detector dijalankan tiap N decode; di antaranya kotak terakhir dipakai ulang.
+# Hanya diakses dari satu thread decode, jadi tidak perlu lock
+ROI_DETECT_EVERY = 4
+_ROI_BOX = {'box': None, 'shape': None, 'calls': 0}
+
+def _detect_barcode_box(gray):
+    """Cari barcode dengan detector, return (rotated_rect, (left, top, width, height)) atau None"""
+    ok, points = _ROI_DETECTOR.detect(gray)
+    if not ok or points is None or len(points) == 0:
+        return None
+    
+    # Kotak berputar terbesar; sisi panjang dijadikan horizontal (arah baca bar)
+    corners = max((p.astype(np.float32) for p in points), key=cv2.contourArea)
+    (cx, cy), (w, h), angle = cv2.minAreaRect(corners)
+    if w < h:
+        w, h, angle = h, w, angle + 90
+    if w < 1 or h < 1:
+        return None
+    return ((cx, cy), (w, h), angle), cv2.boundingRect(corners)
+
+def _barcode_box(gray):
+    """Kotak barcode untuk frame ini: deteksi ulang tiap ROI_DETECT_EVERY panggilan, selain itu cache"""
+    state = _ROI_BOX
+    if gray.shape != state['shape'] or state['calls'] % ROI_DETECT_EVERY == 0:
+        state['box'] = _detect_barcode_box(gray)
+        state['shape'] = gray.shape
+        state['calls'] = 0
+    state['calls'] += 1
+    return state['box']
+
+def _warp_barcode_box(gray, rotated_rect):
+    """Potong kotak berputar menjadi gambar tegak (plus margin quiet zone)"""
+    (cx, cy), (w, h), angle = rotated_rect
+    out_w = int(w * (1 + 2 * ROI_PAD_RATIO)) + 2 * ROI_PAD_PX
+    out_h = int(h * (1 + 2 * ROI_PAD_RATIO)) + 2 * ROI_PAD_PX
+    M = cv2.getRotationMatrix2D((cx, cy), angle, 1.0)
+    M[0, 2] += out_w / 2 - cx
+    M[1, 2] += out_h / 2 - cy
+    return cv2.warpAffine(gray, M, (out_w, out_h), flags=cv2.INTER_LINEAR,
+                          borderMode=cv2.BORDER_REPLICATE)
+
+def _decode_zxingcpp(image):
+    """Decode dengan zxing-cpp (hanya CODE128), return (barcode_data, corners) atau (None, None)"""
+    for result in zxingcpp.read_barcodes(image, formats=zxingcpp.BarcodeFormat.Code128):
+        if result.text:
+            pos = result.position
+            corners = np.array([(p.x, p.y) for p in (pos.top_left, pos.top_right,
+                                                      pos.bottom_right, pos.bottom_left)], dtype=np.float32)
+            return result.text, corners
+    return None, None
+
+def _decode_zxing_jvm(gray):
+    """Decode array grayscale langsung di JVM persistent (tanpa file/subprocess)"""
+    height, width = gray.shape[:2]
+    data = ZXING_JVM['bytes'](gray.reshape(-1).view(np.int8))
+    source = ZXING_JVM['source'](data, width, height, 0, 0, width, height, False)
+    bitmap = ZXING_JVM['bitmap'](ZXING_JVM['binarizer'](source))
+    try:
+        return str(ZXING_JVM['reader'].decode(bitmap).getText())
+    except ZXING_JVM['error']:
+        return None
+
+def _decode_frame(roi, offset=(0, 0), temp_frame_path=None, scale=1.0):
+    """Decode area scan (grayscale) di worker thread, return (barcode_data, rect) atau (None, None)
+
+    rect dikembalikan dalam koordinat frame penuh: dibagi scale lalu ditambah offset ROI.
+    Jika detector menemukan barcode, potongan di sekitarnya di-decode dulu; jika gagal
+    (kotak salah/terpotong), seluruh area scan tetap di-decode.
+    """
+    box = _barcode_box(roi) if _ROI_DETECTOR is not None else None
+    if box is not None:
+        rotated_rect, (left, top, width, height) = box
+        barcode_data, _ = _decode_image(_warp_barcode_box(roi, rotated_rect), temp_frame_path=temp_frame_path)
+        if barcode_data:
+            off_x, off_y = offset
+            return barcode_data, (int(left / scale) + off_x, int(top / scale) + off_y,
+                                  int(width / scale), int(height / scale))
+        # Kotak tidak menghasilkan apa-apa: deteksi ulang di decode berikutnya
+        _ROI_BOX['calls'] = 0
+    
+    return _decode_image(roi, offset, temp_frame_path, scale)
+
+def _decode_image(roi, offset=(0, 0), temp_frame_path=None, scale=1.0):
+    """Decode satu gambar grayscale dengan scanner aktif, return (barcode_data, rect) atau (None, None)"""
+    if SCANNER_METHOD == "zxingcpp":
+        barcode_data, corners = _decode_zxingcpp(roi)
+        if barcode_data:
+            if corners is None:
+                return barcode_data, None
+            off_x, off_y = offset
+            left, top = corners.min(axis=0) / scale
+            right, bottom = corners.max(axis=0) / scale
+            return barcode_data, (int(left) + off_x, int(top) + off_y, int(right - left), int(bottom - top))
+    
+    elif SCANNER_METHOD == "pyzxing" and ZXING_JVM is not None:
+        barcode_data = _decode_zxing_jvm(roi)
+        if barcode_data:
+            return barcode_data, None
+    
+    elif SCANNER_METHOD == "pyzxing":
+        # pyzxing hanya menerima path: encode di memori, tulis sekali ke tmpfs
+        ok, jpeg = cv2.imencode('.jpg', roi, [int(cv2.IMWRITE_JPEG_QUALITY), SCAN_JPEG_QUALITY])
+        if not ok:
+            return None, None
+        with open(temp_frame_path, 'wb') as f:
+            f.write(jpeg.data)
+        results = reader.decode(temp_frame_path)
+        
+        if results and len(results) > 0:
+            barcode_data = results[0].get('parsed', None)
+            if barcode_data:
+                return barcode_data, None
+    
+    elif SCANNER_METHOD == "pyzbar":
+        decoded_objects = decode(roi, symbols=PYZBAR_SYMBOLS)
+        
+        if decoded_objects:
+            obj = decoded_objects[0]
+            rect = obj.rect
+            off_x, off_y = offset
+            return obj.data.decode('utf-8'), (int(rect.left / scale) + off_x, int(rect.top / scale) + off_y,
+                                              int(rect.width / scale), int(rect.height / scale))
+    
+    return None, None
+
 # ==================== ORIGINAL OPENCV WINDOW SCANNER ====================
 
 def scan_barcode_from_camera():
@@ -347,10 +768,18 @@ def scan_barcode_from_camera():
         }
     
     try:
-        cap = cv2.VideoCapture(0)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+        cap = _open_camera(0)
+        # Buffer 1 frame: read() selalu dapat frame terbaru, bukan antrean lama
+        if not cap.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+            print("⚠️ Backend kamera tidak mendukung CAP_PROP_BUFFERSIZE, antrean dikuras thread grabber")
+        # MJPEG: bandwidth USB jauh lebih kecil daripada YUYV mentah
+        mjpg = cv2.VideoWriter_fourcc(*'MJPG')
+        cap.set(cv2.CAP_PROP_FOURCC, mjpg)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
         cap.set(cv2.CAP_PROP_FPS, 30)
+        if int(cap.get(cv2.CAP_PROP_FOURCC)) != mjpg:
+            print("ℹ️ Kamera tidak mendukung MJPEG, memakai format bawaan driver")
         
         if not cap.isOpened():
             return {
@@ -369,55 +798,107 @@ def scan_barcode_from_camera():
         
         barcode_detected = None
         frame_count = 0
-        scan_interval = 10
-        max_frames = 900
+        scan_interval = 4  # awal; disesuaikan dari durasi decode yang terukur
+        scan_ms = None  # EMA durasi decode (ms)
+        scan_timeout = 30.0  # detik, tidak tergantung FPS kamera yang sebenarnya
         
-        temp_frame_path = "temp_scan_frame.jpg" if SCANNER_METHOD == "pyzxing" else None
+        temp_frame_path = _scan_temp_path() if SCANNER_METHOD == "pyzxing" and ZXING_JVM is None else None
         
         window_name = "🏪 Kantin Scanner - Real-time Preview (Tekan Q untuk keluar)"
         cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
-        cv2.resizeWindow(window_name, 1280, 720)
+        cv2.resizeWindow(window_name, CAMERA_WIDTH * 3 // 2, CAMERA_HEIGHT * 3 // 2)
+        
+        # Kamera dibaca di thread terpisah; loop ini hanya ambil frame terbaru
+        slot = _new_frame_slot()
+        stop_event = threading.Event()
+        grabber = threading.Thread(target=_grab_frames, args=(cap, slot, stop_event), daemon=True)
+        grabber.start()
+        last_seq = 0
+        
+        # Decode jalan di worker thread; preview tetap render setiap frame
+        decoder = _scan_pool()
+        _ROI_BOX['calls'] = 0  # kotak barcode sesi sebelumnya tidak berlaku lagi
+        pending = None
+        next_scan_frame = 0
+        last_scan_frame = -MOTION_FORCE_SCAN_FRAMES
+        prev_small = None
+        last_scanned = None  # (thumbnail, scale) frame terakhir yang dikirim ke decoder
+        decode_misses = 0
+        frame_shape = None
+        pending_scale = 1.0
         
-        while frame_count < max_frames:
-            ret, frame = cap.read()
+        # Nilai tetap selama loop: dibaca sekali dari driver, bukan per frame
+        fps_text = f"FPS: {int(cap.get(cv2.CAP_PROP_FPS)) or 30}"
+        fps_pos = ((int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or CAMERA_WIDTH) - 120, 30)
+        frame_times = deque(maxlen=30)  # jendela bergulir waktu frame untuk FPS nyata
+        
+        # pollKey (OpenCV >= 4.5) cek keyboard tanpa tidur 1 ms seperti waitKey(1)
+        poll_key = cv2.pollKey if hasattr(cv2, 'pollKey') else (lambda: cv2.waitKey(1))
+        
+        deadline = time.monotonic() + scan_timeout
+        while time.monotonic() < deadline:
+            frame, last_seq = _wait_frame(slot, last_seq)
             
-            if not ret:
+            if frame is None:
                 break
             
-            frame = cv2.flip(frame, 1)
-            
             current_status = "scanning"
             current_message = "Arahkan barcode ke area hijau - Hold steady"
             detected_rect = None
             
-            if frame_count % scan_interval == 0:
+            # Ambil hasil decode yang sudah selesai (tidak pernah menunggu)
+            if pending is not None and pending.done():
+                # Perbarui EMA durasi decode -> scan sesering yang sanggup ditangani CPU
+                elapsed_ms = (time.perf_counter() - pending_started) * 1000
+                scan_ms = elapsed_ms if scan_ms is None else 0.8 * scan_ms + 0.2 * elapsed_ms
+                scan_interval = min(SCAN_INTERVAL_MAX, max(1, int(scan_ms / FRAME_BUDGET_MS * 1.2)))
                 try:
-                    if SCANNER_METHOD == "pyzxing":
-                        cv2.imwrite(temp_frame_path, frame)
-                        results = reader.decode(temp_frame_path)
-                        
-                        if results and len(results) > 0:
-                            barcode_data = results[0].get('parsed', None)
-                            if barcode_data:
-                                barcode_detected = barcode_data
-                                current_status = "detected"
-                                current_message = f"BARCODE TERDETEKSI: {barcode_data}"
-                    
-                    elif SCANNER_METHOD == "pyzbar":
-                        decoded_objects = decode(frame)
-                        
-                        if decoded_objects:
-                            obj = decoded_objects[0]
-                            barcode_data = obj.data.decode('utf-8')
-                            barcode_detected = barcode_data
-                            current_status = "detected"
-                            current_message = f"BARCODE TERDETEKSI: {barcode_data}"
-                            
-                            rect = obj.rect
-                            detected_rect = (rect.left, rect.top, rect.width, rect.height)
-                
+                    barcode_data, rect = pending.result()
+                    decode_misses = 0 if barcode_data or pending_scale == 1.0 else decode_misses + 1
+                    if barcode_data:
+                        barcode_detected = barcode_data
+                        detected_rect = rect
+                        current_status = "detected"
+                        current_message = f"BARCODE TERDETEKSI: {barcode_data}"
                 except Exception:
                     current_status = "scanning"
+                pending = None
+            
+            # Hanya area scan yang di-decode (~4x lebih sedikit piksel dari frame penuh);
+            # geometri dihitung ulang hanya jika ukuran frame berubah
+            if frame.shape != frame_shape:
+                frame_shape = frame.shape
+                scan_x, scan_y, scan_width, scan_height = _scan_area(frame_shape[1], frame_shape[0])
+            roi = frame[scan_y:scan_y + scan_height, scan_x:scan_x + scan_width]
+            
+            # Ukur gerakan di versi kecil area scan: barcode yang masih digeser jarang terbaca
+            small = cv2.cvtColor(cv2.resize(roi, MOTION_SIZE, interpolation=cv2.INTER_AREA),
+                                 cv2.COLOR_BGR2GRAY)
+            steady = prev_small is None or cv2.absdiff(small, prev_small).mean() < MOTION_THRESHOLD
+            prev_small = small
+            
+            # Kirim frame baru ke worker hanya jika decode sebelumnya sudah selesai
+            if (pending is None and not barcode_detected and frame_count >= next_scan_frame
+                    and (steady or frame_count - last_scan_frame >= MOTION_FORCE_SCAN_FRAMES)):
+                # Setelah beberapa kali gagal di resolusi kecil, coba sekali resolusi penuh
+                pending_scale = 1.0 if decode_misses >= FULLRES_RETRY_MISSES else min(1.0, DECODE_MAX_WIDTH / scan_width)
+                
+                if (last_scanned is not None and last_scanned[1] == pending_scale
+                        and cv2.absdiff(small, last_scanned[0]).mean() < DUPLICATE_THRESHOLD):
+                    # Gambar praktis sama dengan yang barusan gagal -> hasil gagal dipakai ulang
+                    decode_misses += 1
+                else:
+                    # Decoder hanya butuh luminance; cvtColor sekaligus jadi salinan untuk worker.
+                    # Grayscale dulu baru resize: resize cukup memproses 1 channel
+                    roi = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+                    if pending_scale != 1.0:
+                        roi = cv2.resize(roi, None, fx=pending_scale, fy=pending_scale,
+                                         interpolation=cv2.INTER_AREA)
+                    pending = decoder.submit(_decode_frame, roi, (scan_x, scan_y), temp_frame_path, pending_scale)
+                    pending_started = time.perf_counter()
+                    last_scanned = (small, pending_scale)
+                next_scan_frame = frame_count + scan_interval
+                last_scan_frame = frame_count
             
             # Draw UI
             if current_status == "detected" and barcode_detected:
@@ -425,9 +906,11 @@ def scan_barcode_from_camera():
             else:
                 frame = draw_scan_frame(frame, current_status, current_message)
             
-            # Add FPS
-            fps_text = f"FPS: {int(cap.get(cv2.CAP_PROP_FPS))}"
-            cv2.putText(frame, fps_text, (frame.shape[1] - 120, 30),
+            # Add FPS (rata-rata 30 frame terakhir)
+            frame_times.append(time.monotonic())
+            if len(frame_times) > 1 and frame_times[-1] > frame_times[0]:
+                fps_text = f"FPS: {(len(frame_times) - 1) / (frame_times[-1] - frame_times[0]):.0f}"
+            cv2.putText(frame, fps_text, fps_pos,
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
             
             cv2.imshow(window_name, frame)
@@ -436,21 +919,26 @@ def scan_barcode_from_camera():
                 cv2.waitKey(1500)
                 break
             
-            key = cv2.waitKey(1) & 0xFF
+            key = poll_key() & 0xFF
             if key == ord('q') or key == ord('Q'):
                 print("👋 Scan dibatalkan oleh user")
                 break
             
             frame_count += 1
         
+        # Hentikan grabber dulu supaya cap.read() tidak jalan saat release
+        stop_event.set()
+        grabber.join(timeout=2.0)
+        if pending is not None:
+            pending.exception()  # tunggu decode terakhir selesai sebelum file sementara dihapus
         cap.release()
         cv2.destroyAllWindows()
         
-        if temp_frame_path and os.path.exists(temp_frame_path):
+        if temp_frame_path:
             try:
                 os.remove(temp_frame_path)
-            except:
-                pass
+            except OSError:
+                pass  # belum pernah ditulis atau sudah terhapus
         
         if barcode_detected:
             return {
@@ -505,12 +993,27 @@ def scan_barcode_from_image(image_path):
                         'message': f"Barcode berhasil di-scan: {barcode_data}"
                     }
         
+        elif SCANNER_METHOD == "zxingcpp":
+            image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                return {'success': False, 'message': "Gagal membaca gambar!"}
+            image = _downscale_for_decode(image)
+            
+            barcode_data, _ = _decode_zxingcpp(image)
+            if barcode_data:
+                return {
+                    'success': True,
+                    'barcode_id': barcode_data,
+                    'message': f"Barcode berhasil di-scan: {barcode_data}"
+                }
+        
         elif SCANNER_METHOD == "pyzbar":
-            image = cv2.imread(image_path)
+            image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
             if image is None:
                 return {'success': False, 'message': "Gagal membaca gambar!"}
+            image = _downscale_for_decode(image)
             
-            decoded_objects = decode(image)
+            decoded_objects = decode(image, symbols=PYZBAR_SYMBOLS)
             if decoded_objects:
                 barcode_data = decoded_objects[0].data.decode('utf-8')
                 return {
@@ -530,15 +1033,17 @@ def scan_barcode_from_image(image_path):
             'message': f"Error: {str(e)}"
         }
 
+@lru_cache(maxsize=1024)
+def _is_valid_barcode(barcode_id):
+    """Cek format barcode (hasil di-cache per ID)"""
+    return isinstance(barcode_id, str) and len(barcode_id) >= 3 and ' ' not in barcode_id
+
 def validate_barcode_format(barcode_id):
     """Validasi format barcode ID"""
     try:
-        if len(barcode_id) < 3:
-            return False
-        if ' ' in barcode_id:
-            return False
-        return True
-    except:
+        return _is_valid_barcode(barcode_id)
+    except TypeError:
+        # Nilai unhashable (list, dict, ...) tidak bisa jadi key cache dan bukan barcode
         return False
 
 def check_scanner_availability():
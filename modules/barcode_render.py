@@ -0,0 +1,32 @@
+"""
+Module untuk render barcode Code128 ke file PNG
+Sengaja ringan: tidak ada setup scanner, JVM, numba, atau streamlit saat import,
+karena modul ini di-import ulang oleh setiap proses worker batch (spawn di Windows)
+"""
+
+import barcode
+from barcode.writer import ImageWriter
+
+# Class CODE128 dicari sekali saat import, bukan tiap barcode
+_CODE128 = barcode.get_barcode_class('code128')
+
+# ImageWriter dipakai ulang selama batch (satu per proses)
+_BATCH_WRITER = {}
+
+def render_barcode(barcode_id, writer):
+    """Render barcode ke barcodes/<id>.png memakai writer yang sudah ada, return path atau None"""
+    try:
+        barcode_instance = _CODE128(barcode_id, writer=writer)
+        filename = f"barcodes/{barcode_id}"
+        full_path = barcode_instance.save(filename)
+        return full_path
+    except Exception as e:
+        print(f"Error generating barcode: {e}")
+        return None
+
+def render_batch_item(item):
+    """Worker batch: item = (barcode_id, nama_produk), return (barcode_id, berhasil)"""
+    barcode_id, product_name = item
+    if not _BATCH_WRITER:
+        _BATCH_WRITER['writer'] = ImageWriter()
+    return barcode_id, render_barcode(barcode_id, _BATCH_WRITER['writer']) is not None
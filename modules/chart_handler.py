@@ -6,8 +6,21 @@ Menggunakan plotly untuk grafik interaktif
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 
+# Numba opsional untuk kernel agregasi harian
+NUMBA_AVAILABLE = False
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    pass
+
+from .data_handler import count_low_stock
+
+NS_PER_DAY = 86_400_000_000_000
+
 # ==================== FUNGSI STATISTIK ====================
 
 def calculate_statistics(products_df, transactions_df):
@@ -27,13 +40,15 @@ def calculate_statistics(products_df, transactions_df):
         # Statistik produk
         stats['total_products'] = len(products_df) if not products_df.empty else 0
         stats['total_stock'] = products_df['stok'].sum() if not products_df.empty else 0
-        stats['low_stock_count'] = len(products_df[products_df['stok'] < 10]) if not products_df.empty else 0
+        stats['low_stock_count'] = count_low_stock(products_df['stok']) if not products_df.empty else 0
         
         # Statistik transaksi hari ini
         if not transactions_df.empty:
-            transactions_df['tanggal'] = pd.to_datetime(transactions_df['waktu']).dt.date
-            today = datetime.now().date()
-            today_trans = transactions_df[transactions_df['tanggal'] == today]
+            # Bandingkan langsung di datetime64 (tanpa menulis kolom baru ke frame pemanggil)
+            waktu = pd.to_datetime(transactions_df['waktu'])
+            today = pd.Timestamp(datetime.now().date())
+            is_today = (waktu >= today) & (waktu < today + pd.Timedelta(days=1))
+            today_trans = transactions_df.loc[is_today]
             
             stats['today_transactions'] = len(today_trans)
             stats['today_revenue'] = today_trans['total_harga'].sum() if not today_trans.empty else 0
@@ -69,6 +84,98 @@ def calculate_statistics(products_df, transactions_df):
             'total_profit': 0
         }
 
+# ==================== FUNGSI AGREGASI ====================
+
+if NUMBA_AVAILABLE:
+    # Signature eksplisit: dikompilasi saat import (bukan saat laporan pertama dibuka),
+    # cache=True menyimpan hasil kompilasi di disk untuk start berikutnya
+    @njit("UniTuple(int64[:], 3)(int64[:], int64[:], int64[:], int64)", cache=True)
+    def _daily_sums(day_ids, total, profit, n_days):
+        """Jumlahkan total, keuntungan, dan banyak transaksi per indeks hari"""
+        out_total = np.zeros(n_days, dtype=np.int64)
+        out_profit = np.zeros(n_days, dtype=np.int64)
+        out_count = np.zeros(n_days, dtype=np.int64)
+        # Serial: beberapa baris bisa menulis hari yang sama (prange akan race)
+        for i in range(day_ids.size):
+            d = day_ids[i]
+            out_total[d] += total[i]
+            out_profit[d] += profit[i]
+            out_count[d] += 1
+        return out_total, out_profit, out_count
+else:
+    def _daily_sums(day_ids, total, profit, n_days):
+        """Jumlahkan total, keuntungan, dan banyak transaksi per indeks hari (NumPy)"""
+        out_total = np.bincount(day_ids, weights=total, minlength=n_days).astype(np.int64)
+        out_profit = np.bincount(day_ids, weights=profit, minlength=n_days).astype(np.int64)
+        out_count = np.bincount(day_ids, minlength=n_days).astype(np.int64)
+        return out_total, out_profit, out_count
+
+def _aggregate_daily_groupby(transactions_df):
+    """Agregasi harian versi pandas groupby (fallback untuk data tidak standar)"""
+    tanggal = pd.to_datetime(transactions_df['waktu']).dt.floor('D')
+    daily = transactions_df.groupby(tanggal).agg(
+        total_harga=('total_harga', 'sum'),
+        keuntungan=('keuntungan', 'sum'),
+        jumlah_transaksi=('total_harga', 'size')
+    )
+    return daily.rename_axis('tanggal').reset_index()
+
+def aggregate_daily(transactions_df):
+    """
+    Fungsi untuk merangkum transaksi per hari (dipakai bersama oleh beberapa grafik)
+    
+    Args:
+        transactions_df: DataFrame transaksi
+        
+    Returns:
+        DataFrame: Kolom tanggal, total_harga, keuntungan, jumlah_transaksi
+    """
+    try:
+        waktu_ns = pd.to_datetime(transactions_df['waktu']).to_numpy(dtype='datetime64[ns]')
+        valid = ~np.isnat(waktu_ns)
+        day_ns = waktu_ns[valid].view(np.int64) // NS_PER_DAY
+        total = transactions_df['total_harga'].to_numpy(dtype=np.int64)[valid]
+        profit = transactions_df['keuntungan'].to_numpy(dtype=np.int64)[valid]
+    except (ValueError, TypeError):
+        # Ada nilai kosong/non-angka di kolom uang
+        return _aggregate_daily_groupby(transactions_df)
+    
+    if day_ns.size == 0:
+        return _aggregate_daily_groupby(transactions_df)
+    
+    # Indeks hari relatif terhadap hari pertama -> kernel cukup pakai array padat
+    first_day = day_ns.min()
+    day_ids = day_ns - first_day
+    n_days = int(day_ids.max()) + 1
+    out_total, out_profit, out_count = _daily_sums(day_ids, total, profit, n_days)
+    
+    present = out_count > 0
+    tanggal = ((first_day + np.flatnonzero(present)) * NS_PER_DAY).astype('datetime64[ns]')
+    return pd.DataFrame({
+        'tanggal': tanggal,
+        'total_harga': out_total[present],
+        'keuntungan': out_profit[present],
+        'jumlah_transaksi': out_count[present]
+    })
+
+def aggregate_product_sales(transactions_df, top_n=10):
+    """
+    Fungsi untuk menghitung produk terlaris berdasarkan jumlah terjual
+    
+    Args:
+        transactions_df: DataFrame transaksi
+        top_n: Jumlah produk teratas yang diambil
+        
+    Returns:
+        DataFrame: Kolom nama_produk, jumlah (urut menurun)
+    """
+    return (
+        transactions_df.groupby('nama_produk')['jumlah']
+        .sum()
+        .nlargest(top_n)
+        .reset_index()
+    )
+
 # ==================== FUNGSI GRAFIK STOK ====================
 
 def create_stock_chart(products_df):
@@ -82,8 +189,8 @@ def create_stock_chart(products_df):
         plotly figure: Grafik stok
     """
     try:
-        # Sort berdasarkan stok (descending)
-        df_sorted = products_df.sort_values('stok', ascending=False).head(10)
+        # Ambil 10 stok terbesar (tanpa sort seluruh tabel)
+        df_sorted = products_df.nlargest(10, 'stok')
         
         # Buat bar chart
         fig = px.bar(
@@ -120,7 +227,7 @@ def create_stock_category_chart(products_df):
     """
     try:
         # Group by kategori
-        category_stock = products_df.groupby('kategori')['stok'].sum().reset_index()
+        category_stock = products_df.groupby('kategori', observed=True)['stok'].sum().reset_index()
         
         # Buat pie chart
         fig = px.pie(
@@ -140,34 +247,26 @@ def create_stock_category_chart(products_df):
 
 # ==================== FUNGSI GRAFIK PENJUALAN ====================
 
-def create_sales_chart(transactions_df):
+def create_sales_chart(transactions_df, daily_df=None):
     """
     Fungsi untuk membuat grafik penjualan harian
     
     Args:
         transactions_df: DataFrame transaksi
+        daily_df: Hasil aggregate_daily (opsional, dihitung jika None)
         
     Returns:
         plotly figure: Grafik line penjualan
     """
     try:
-        # Convert waktu ke datetime dan extract tanggal
-        transactions_df['tanggal'] = pd.to_datetime(transactions_df['waktu']).dt.date
-        
-        # Group by tanggal
-        daily_sales = transactions_df.groupby('tanggal').agg({
-            'total_harga': 'sum',
-            'transaksi_id': 'count'
-        }).reset_index()
-        
-        daily_sales.columns = ['tanggal', 'total_penjualan', 'jumlah_transaksi']
+        daily_sales = daily_df if daily_df is not None else aggregate_daily(transactions_df)
         
         # Buat line chart
         fig = go.Figure()
         
         fig.add_trace(go.Scatter(
             x=daily_sales['tanggal'],
-            y=daily_sales['total_penjualan'],
+            y=daily_sales['total_harga'],
             mode='lines+markers',
             name='Total Penjualan (Rp)',
             line=dict(color='blue', width=3),
@@ -188,25 +287,21 @@ def create_sales_chart(transactions_df):
         print(f"Error creating sales chart: {e}")
         return go.Figure()
 
-def create_product_sales_chart(transactions_df):
+def create_product_sales_chart(transactions_df, product_sales=None):
     """
     Fungsi untuk membuat grafik produk terlaris
     
     Args:
         transactions_df: DataFrame transaksi
+        product_sales: Hasil aggregate_product_sales (opsional, dihitung jika None)
         
     Returns:
         plotly figure: Grafik bar produk terlaris
     """
     try:
-        # Group by produk
-        product_sales = transactions_df.groupby('nama_produk').agg({
-            'jumlah': 'sum',
-            'total_harga': 'sum'
-        }).reset_index()
-        
-        # Sort dan ambil top 10
-        product_sales = product_sales.sort_values('jumlah', ascending=False).head(10)
+        # Top 10 diambil sebelum masuk ke plotly
+        if product_sales is None:
+            product_sales = aggregate_product_sales(transactions_df)
         
         # Buat bar chart
         fig = px.bar(
@@ -233,27 +328,19 @@ def create_product_sales_chart(transactions_df):
 
 # ==================== FUNGSI GRAFIK KEUNTUNGAN ====================
 
-def create_profit_chart(transactions_df):
+def create_profit_chart(transactions_df, daily_df=None):
     """
     Fungsi untuk membuat grafik keuntungan harian
     
     Args:
         transactions_df: DataFrame transaksi
+        daily_df: Hasil aggregate_daily (opsional, dihitung jika None)
         
     Returns:
         plotly figure: Grafik keuntungan
     """
     try:
-        # Convert waktu ke datetime dan extract tanggal
-        transactions_df['tanggal'] = pd.to_datetime(transactions_df['waktu']).dt.date
-        
-        # Group by tanggal
-        daily_profit = transactions_df.groupby('tanggal').agg({
-            'keuntungan': 'sum',
-            'total_harga': 'sum'
-        }).reset_index()
-        
-        daily_profit.columns = ['tanggal', 'keuntungan', 'pendapatan']
+        daily_profit = daily_df if daily_df is not None else aggregate_daily(transactions_df)
         
         # Buat bar chart
         fig = go.Figure()
@@ -278,31 +365,23 @@ def create_profit_chart(transactions_df):
         print(f"Error creating profit chart: {e}")
         return go.Figure()
 
-def create_profit_comparison_chart(transactions_df):
+def create_profit_comparison_chart(transactions_df, daily_df=None):
     """
     Fungsi untuk membuat grafik perbandingan pendapatan vs keuntungan
     
     Args:
         transactions_df: DataFrame transaksi
+        daily_df: Hasil aggregate_daily (opsional, dihitung jika None)
         
     Returns:
         plotly figure: Grafik perbandingan
     """
     try:
-        # Convert waktu ke datetime dan extract tanggal
-        transactions_df['tanggal'] = pd.to_datetime(transactions_df['waktu']).dt.date
-        
-        # Group by tanggal
-        daily_data = transactions_df.groupby('tanggal').agg({
-            'total_harga': 'sum',
-            'keuntungan': 'sum'
-        }).reset_index()
-        
-        daily_data.columns = ['tanggal', 'pendapatan', 'keuntungan']
+        daily_data = daily_df if daily_df is not None else aggregate_daily(transactions_df)
         
         # Buat grouped bar chart
         fig = go.Figure(data=[
-            go.Bar(name='Pendapatan', x=daily_data['tanggal'], y=daily_data['pendapatan'], marker_color='lightblue'),
+            go.Bar(name='Pendapatan', x=daily_data['tanggal'], y=daily_data['total_harga'], marker_color='lightblue'),
             go.Bar(name='Keuntungan', x=daily_data['tanggal'], y=daily_data['keuntungan'], marker_color='green')
         ])
         
@@ -342,7 +421,7 @@ def create_category_revenue_chart(transactions_df, products_df):
         )
         
         # Group by kategori
-        category_revenue = merged_df.groupby('kategori')['total_harga'].sum().reset_index()
+        category_revenue = merged_df.groupby('kategori', observed=True)['total_harga'].sum().reset_index()
         category_revenue.columns = ['kategori', 'pendapatan']
         
         # Buat pie chart
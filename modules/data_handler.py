@@ -4,12 +4,122 @@ Semua fungsi menggunakan pendekatan pemrograman terstruktur (tanpa OOP)
 """
 
 import pandas as pd
+import numpy as np
 import os
+import streamlit as st
 from datetime import datetime
 
+from .utils import ensure_directory
+
+# Numba opsional untuk kernel hitung stok menipis
+NUMBA_AVAILABLE = False
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    pass
+
 # Path file data
 PRODUCTS_FILE = "data/products.csv"
 TRANSACTIONS_FILE = "data/transactions.csv"
+TRANSACTIONS_PARQUET = "data/transactions.parquet"
+TRANSACTIONS_MIGRATED = "data/transactions.csv.migrated"  # CSV lama setelah dipindah ke Parquet
+
+# pyarrow ikut terpasang bersama streamlit: dipakai untuk parser CSV (multi-thread)
+# dan penyimpanan transaksi dalam format Parquet
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+CSV_ENGINE = "pyarrow" if PYARROW_AVAILABLE else "c"
+
+# Tipe kolom numerik produk (hindari inferensi int64/float64 tiap baca)
+PRODUCTS_DTYPES = {
+    'stok': 'int32',
+    'harga_modal': 'int32',
+    'harga_jual': 'int32'
+}
+
+# Tipe kolom numerik transaksi; total & keuntungan int64 karena akumulasi Rupiah bisa besar
+TRANSACTIONS_DTYPES = {
+    'jumlah': 'int32',
+    'harga_satuan': 'int32',
+    'total_harga': 'int64',
+    'keuntungan': 'int64'
+}
+
+# Daftar kategori produk (urutan = urutan pilihan di UI)
+CATEGORIES = ("Makanan", "Minuman", "Snack", "Alat Tulis", "Lainnya")
+
+# ==================== FUNGSI CACHE ====================
+
+def get_file_mtime(path):
+    """
+    Fungsi untuk mengambil waktu modifikasi terakhir sebuah file
+    Dipakai sebagai kunci cache supaya cache otomatis basi saat file berubah
+    
+    Args:
+        path: Path file
+        
+    Returns:
+        float: mtime file, atau 0.0 jika file belum ada
+    """
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+def _read_csv(path, dtype=None, parse_dates=None):
+    """Baca CSV dengan engine tercepat; jatuh ke inferensi dtype jika data tidak sesuai"""
+    try:
+        return pd.read_csv(path, engine=CSV_ENGINE, dtype=dtype, parse_dates=parse_dates)
+    except ValueError:
+        # Data lama/hasil edit manual bisa berisi sel kosong di kolom angka
+        return pd.read_csv(path, engine=CSV_ENGINE, parse_dates=parse_dates)
+
+def _as_category(series):
+    """Ubah kolom kategori ke dtype category; kategori di luar CATEGORIES tetap dipertahankan"""
+    extra = [value for value in pd.unique(series.dropna()) if value not in CATEGORIES]
+    return series.astype(pd.CategoricalDtype(categories=list(CATEGORIES) + extra))
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _read_products_csv(path, mtime):
+    """Baca CSV produk (mtime hanya untuk kunci cache)"""
+    df = _read_csv(path, dtype=PRODUCTS_DTYPES)
+    if 'kategori' in df.columns:
+        # Filter kategori jadi perbandingan kode integer, bukan string
+        df['kategori'] = _as_category(df['kategori'])
+    return df
+
+def get_transactions_path():
+    """Path file transaksi yang aktif: Parquet jika pyarrow tersedia, selain itu CSV"""
+    return TRANSACTIONS_PARQUET if PYARROW_AVAILABLE else TRANSACTIONS_FILE
+
+def _prepare_transactions(df):
+    """Pastikan kolom waktu datetime64 dan data terurut waktu"""
+    if not pd.api.types.is_datetime64_any_dtype(df['waktu']):
+        # Ada nilai waktu yang tidak terbaca: jadikan NaT supaya filter tanggal tetap jalan
+        df['waktu'] = pd.to_datetime(df['waktu'], errors='coerce')
+    # Urut waktu (stabil) supaya filter periode bisa pakai binary search
+    return df.sort_values('waktu', kind='stable').reset_index(drop=True)
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _read_transactions_csv(path, mtime):
+    """Baca CSV transaksi (mtime hanya untuk kunci cache), kolom waktu langsung datetime64"""
+    return _prepare_transactions(_read_csv(path, dtype=TRANSACTIONS_DTYPES, parse_dates=['waktu']))
+
+def _transactions_with_dtypes(df):
+    """Terapkan TRANSACTIONS_DTYPES (kolom yang ada saja); kolom yang tidak bisa di-cast dibiarkan"""
+    dtypes = {col: dtype for col, dtype in TRANSACTIONS_DTYPES.items() if col in df.columns}
+    return df.astype(dtypes, errors='ignore')
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _read_transactions_parquet(path, mtime):
+    """Baca Parquet transaksi (mtime hanya untuk kunci cache); tipe kolom diseragamkan ke TRANSACTIONS_DTYPES"""
+    # File lama bisa berisi int64 (disimpan sebelum dtype diterapkan saat simpan)
+    return _prepare_transactions(_transactions_with_dtypes(pd.read_parquet(path)))
 
 # ==================== FUNGSI LOAD DATA ====================
 
@@ -22,8 +132,7 @@ def load_products_data():
     """
     try:
         if os.path.exists(PRODUCTS_FILE):
-            df = pd.read_csv(PRODUCTS_FILE)
-            return df
+            return _read_products_csv(PRODUCTS_FILE, get_file_mtime(PRODUCTS_FILE))
         else:
             # Buat file baru jika belum ada
             df = pd.DataFrame(columns=[
@@ -32,34 +141,58 @@ def load_products_data():
                 'tanggal_input'
             ])
             # Buat folder data jika belum ada
-            os.makedirs("data", exist_ok=True)
+            ensure_directory("data")
             df.to_csv(PRODUCTS_FILE, index=False)
             return df
     except Exception as e:
         print(f"Error loading products: {e}")
         return pd.DataFrame()
 
+def load_products_indexed():
+    """
+    Fungsi untuk memuat data produk dengan index barcode_id
+    Kolom barcode_id tetap ada, index dipakai untuk lookup cepat df.loc[barcode_id]
+    
+    Returns:
+        DataFrame: Data produk ber-index barcode_id
+    """
+    df = load_products_data()
+    if 'barcode_id' not in df.columns:
+        return df
+    return df.set_index('barcode_id', drop=False).rename_axis(None)
+
 def load_transactions_data():
     """
-    Fungsi untuk memuat data transaksi dari CSV
+    Fungsi untuk memuat data transaksi dari Parquet (atau CSV jika pyarrow tidak ada)
     
     Returns:
         DataFrame: Data transaksi
     """
     try:
-        if os.path.exists(TRANSACTIONS_FILE):
-            df = pd.read_csv(TRANSACTIONS_FILE)
-            return df
-        else:
-            # Buat file baru jika belum ada
-            df = pd.DataFrame(columns=[
-                'transaksi_id', 'waktu', 'barcode_id', 
-                'nama_produk', 'jumlah', 'harga_satuan', 
-                'total_harga', 'keuntungan'
-            ])
-            os.makedirs("data", exist_ok=True)
-            df.to_csv(TRANSACTIONS_FILE, index=False)
-            return df
+        if PYARROW_AVAILABLE:
+            # Migrasi otomatis dari CSV versi lama. Setelah Parquet tersimpan, CSV di-rename
+            # supaya tidak ikut di-backup dan tidak di-import ulang menimpa data yang lebih baru
+            # jika Parquet hilang. Jika simpan gagal, data tetap dipakai dari CSV dan migrasi
+            # dicoba lagi di pembacaan berikutnya
+            if not os.path.exists(TRANSACTIONS_PARQUET) and os.path.exists(TRANSACTIONS_FILE):
+                df = _read_transactions_csv(TRANSACTIONS_FILE, get_file_mtime(TRANSACTIONS_FILE))
+                if save_transactions_data(df):
+                    os.replace(TRANSACTIONS_FILE, TRANSACTIONS_MIGRATED)
+                    _read_transactions_csv.clear()
+                return df
+            if os.path.exists(TRANSACTIONS_PARQUET):
+                return _read_transactions_parquet(TRANSACTIONS_PARQUET, get_file_mtime(TRANSACTIONS_PARQUET))
+        elif os.path.exists(TRANSACTIONS_FILE):
+            return _read_transactions_csv(TRANSACTIONS_FILE, get_file_mtime(TRANSACTIONS_FILE))
+        
+        # Buat file baru jika belum ada
+        df = pd.DataFrame(columns=[
+            'transaksi_id', 'waktu', 'barcode_id', 
+            'nama_produk', 'jumlah', 'harga_satuan', 
+            'total_harga', 'keuntungan'
+        ])
+        save_transactions_data(df)
+        return df
     except Exception as e:
         print(f"Error loading transactions: {e}")
         return pd.DataFrame()
@@ -77,8 +210,11 @@ def save_products_data(df):
         bool: True jika berhasil, False jika gagal
     """
     try:
-        os.makedirs("data", exist_ok=True)
+        ensure_directory("data")
         df.to_csv(PRODUCTS_FILE, index=False)
+        # Buang cache (dan frame yang dipegang app) agar pembacaan berikutnya mengambil data terbaru
+        _read_products_csv.clear()
+        st.session_state.pop('_products_df', None)
         return True
     except Exception as e:
         print(f"Error saving products: {e}")
@@ -86,7 +222,7 @@ def save_products_data(df):
 
 def save_transactions_data(df):
     """
-    Fungsi untuk menyimpan data transaksi ke CSV
+    Fungsi untuk menyimpan data transaksi ke Parquet (atau CSV jika pyarrow tidak ada)
     
     Args:
         df: DataFrame yang akan disimpan
@@ -95,8 +231,17 @@ def save_transactions_data(df):
         bool: True jika berhasil, False jika gagal
     """
     try:
-        os.makedirs("data", exist_ok=True)
-        df.to_csv(TRANSACTIONS_FILE, index=False)
+        ensure_directory("data")
+        # Buang cache agar pembacaan berikutnya mengambil data terbaru
+        if PYARROW_AVAILABLE:
+            # Baris baru dari add_transaction bertipe int64: simpan dengan tipe kolom yang sama dengan CSV
+            _transactions_with_dtypes(df).to_parquet(TRANSACTIONS_PARQUET, compression='zstd', index=False)
+            _read_transactions_parquet.clear()
+        else:
+            df.to_csv(TRANSACTIONS_FILE, index=False)
+            _read_transactions_csv.clear()
+        # Frame yang dipegang app untuk rerun ini juga sudah basi
+        st.session_state.pop('_transactions_df', None)
         return True
     except Exception as e:
         print(f"Error saving transactions: {e}")
@@ -176,13 +321,14 @@ def add_transaction(barcode_id, nama_produk, jumlah, harga_satuan, harga_modal):
     try:
         df = load_transactions_data()
         
-        # Generate ID transaksi
-        if len(df) == 0:
-            transaksi_id = "TRX00001"
-        else:
-            last_id = df['transaksi_id'].iloc[-1]
-            num = int(last_id.replace("TRX", "")) + 1
-            transaksi_id = f"TRX{num:05d}"
+        # Generate ID transaksi dari nomor terbesar, bukan baris terakhir: data diurutkan
+        # per waktu dan baris dengan waktu tidak valid (NaT) ikut berada di akhir
+        id_numbers = pd.to_numeric(
+            df['transaksi_id'].astype(str).str.replace("TRX", "", regex=False),
+            errors='coerce'
+        )
+        num = int(id_numbers.max()) + 1 if id_numbers.notna().any() else 1
+        transaksi_id = f"TRX{num:05d}"
         
         # Hitung total dan keuntungan
         total_harga = jumlah * harga_satuan
@@ -191,7 +337,7 @@ def add_transaction(barcode_id, nama_produk, jumlah, harga_satuan, harga_modal):
         # Tambah data transaksi
         new_trans = {
             'transaksi_id': transaksi_id,
-            'waktu': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'waktu': pd.Timestamp(datetime.now().replace(microsecond=0)),
             'barcode_id': barcode_id,
             'nama_produk': nama_produk,
             'jumlah': jumlah,
@@ -232,10 +378,11 @@ def get_product_by_barcode(barcode_id):
         Series atau None: Data produk atau None jika tidak ditemukan
     """
     try:
-        df = load_products_data()
+        df = load_products_indexed()
         
-        if barcode_id in df['barcode_id'].values:
-            return df[df['barcode_id'] == barcode_id].iloc[0]
+        if barcode_id in df.index:
+            # barcode_id bisa dobel (import CSV): .loc dengan list selalu DataFrame, ambil baris pertama
+            return df.loc[[barcode_id]].iloc[0]
         else:
             return None
             
@@ -243,18 +390,20 @@ def get_product_by_barcode(barcode_id):
         print(f"Error getting product: {e}")
         return None
 
-def search_product(keyword):
+def search_product(keyword, df=None):
     """
     Fungsi untuk mencari produk berdasarkan keyword
     
     Args:
         keyword: Kata kunci pencarian
+        df: DataFrame produk yang sudah dimuat (opsional, dibaca dari file jika None)
         
     Returns:
         DataFrame: Data produk yang cocok
     """
     try:
-        df = load_products_data()
+        if df is None:
+            df = load_products_data()
         
         if not df.empty and keyword:
             mask = df['nama_produk'].str.contains(keyword, case=False, na=False) | \
@@ -267,6 +416,38 @@ def search_product(keyword):
         print(f"Error searching product: {e}")
         return pd.DataFrame()
 
+if NUMBA_AVAILABLE:
+    # Signature eksplisit: dikompilasi saat import, hasil kompilasi di-cache di disk
+    @njit("int64(int32[:], int32)", cache=True)
+    def _count_below(values, threshold):
+        """Hitung elemen yang nilainya di bawah threshold"""
+        count = 0
+        for i in range(values.size):
+            if values[i] < threshold:
+                count += 1
+        return count
+else:
+    def _count_below(values, threshold):
+        """Hitung elemen yang nilainya di bawah threshold (NumPy)"""
+        return np.count_nonzero(values < threshold)
+
+def count_low_stock(stok, threshold=10):
+    """
+    Fungsi untuk menghitung jumlah produk dengan stok menipis
+    
+    Args:
+        stok: Kolom/array stok produk
+        threshold: Batas stok menipis (stok < threshold)
+        
+    Returns:
+        int: Jumlah produk dengan stok menipis
+    """
+    values = np.asarray(stok)
+    if values.dtype.kind not in 'iu':
+        # Ada stok kosong (NaN): kolom jadi float, NaN tidak dihitung menipis
+        return int(np.count_nonzero(values.astype(np.float64) < threshold))
+    return int(_count_below(values.astype(np.int32, copy=False), threshold))
+
 # ==================== FUNGSI UPDATE ====================
 
 def update_product(barcode_id, nama_produk, kategori, stok, harga_modal, harga_jual):
@@ -293,12 +474,13 @@ def update_product(barcode_id, nama_produk, kategori, stok, harga_modal, harga_j
                 'message': f"Produk dengan barcode {barcode_id} tidak ditemukan!"
             }
         
-        # Update data
-        df.loc[df['barcode_id'] == barcode_id, 'nama_produk'] = nama_produk
-        df.loc[df['barcode_id'] == barcode_id, 'kategori'] = kategori
-        df.loc[df['barcode_id'] == barcode_id, 'stok'] = stok
-        df.loc[df['barcode_id'] == barcode_id, 'harga_modal'] = harga_modal
-        df.loc[df['barcode_id'] == barcode_id, 'harga_jual'] = harga_jual
+        # Update data (mask dihitung sekali untuk semua kolom)
+        mask = df['barcode_id'] == barcode_id
+        df.loc[mask, 'nama_produk'] = nama_produk
+        df.loc[mask, 'kategori'] = kategori
+        df.loc[mask, 'stok'] = stok
+        df.loc[mask, 'harga_modal'] = harga_modal
+        df.loc[mask, 'harga_jual'] = harga_jual
         
         if save_products_data(df):
             return {
@@ -340,8 +522,9 @@ def reduce_stock(barcode_id, jumlah, nama_produk, harga_jual):
             }
         
         # Ambil stok dan harga modal
-        current_stock = df.loc[df['barcode_id'] == barcode_id, 'stok'].values[0]
-        harga_modal = df.loc[df['barcode_id'] == barcode_id, 'harga_modal'].values[0]
+        mask = df['barcode_id'] == barcode_id
+        current_stock = df.loc[mask, 'stok'].values[0]
+        harga_modal = df.loc[mask, 'harga_modal'].values[0]
         
         if current_stock < jumlah:
             return {
@@ -351,7 +534,7 @@ def reduce_stock(barcode_id, jumlah, nama_produk, harga_jual):
         
         # Kurangi stok
         new_stock = current_stock - jumlah
-        df.loc[df['barcode_id'] == barcode_id, 'stok'] = new_stock
+        df.loc[mask, 'stok'] = new_stock
         
         # Simpan perubahan
         if save_products_data(df):
@@ -401,9 +584,10 @@ def add_stock(barcode_id, jumlah):
             }
         
         # Tambah stok
-        current_stock = df.loc[df['barcode_id'] == barcode_id, 'stok'].values[0]
+        mask = df['barcode_id'] == barcode_id
+        current_stock = df.loc[mask, 'stok'].values[0]
         new_stock = current_stock + jumlah
-        df.loc[df['barcode_id'] == barcode_id, 'stok'] = new_stock
+        df.loc[mask, 'stok'] = new_stock
         
         if save_products_data(df):
             return {
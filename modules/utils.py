@@ -3,9 +3,15 @@ Module utilitas untuk fungsi-fungsi pembantu
 """
 
 import pandas as pd
+import numpy as np
 import os
-from datetime import datetime
+import io
+import csv
+import numbers
+from decimal import Decimal
+from datetime import datetime, timedelta
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 # ==================== FUNGSI VALIDASI ====================
 
@@ -76,6 +82,9 @@ def validate_date_format(date_str, format="%Y-%m-%d"):
 
 # ==================== FUNGSI FORMATTING ====================
 
+# Tukar pemisah ribuan ',' menjadi '.' (format Rupiah)
+_CURRENCY_TRANS = str.maketrans({',': '.'})
+
 def format_currency(amount):
     """
     Fungsi untuk format angka menjadi format mata uang Rupiah
@@ -86,10 +95,9 @@ def format_currency(amount):
     Returns:
         str: Format Rupiah
     """
-    try:
-        return f"Rp {amount:,.0f}".replace(",", ".")
-    except:
-        return "Rp 0"
+    if isinstance(amount, (numbers.Real, Decimal)):
+        return f"Rp {amount:,.0f}".translate(_CURRENCY_TRANS)
+    return "Rp 0"
 
 def format_date(date_obj, format="%d-%m-%Y"):
     """
@@ -127,6 +135,47 @@ def format_datetime(datetime_str):
 
 # ==================== FUNGSI FILE MANAGEMENT ====================
 
+def ensure_directory(path):
+    """Buat folder jika belum ada (sekali per operasi simpan/export/backup, bukan per item)
+
+    Sengaja tidak di-cache per proses: folder bisa dihapus user saat aplikasi berjalan,
+    dan satu makedirs per operasi jauh lebih murah daripada operasi tulisnya sendiri.
+    """
+    os.makedirs(path, exist_ok=True)
+
+def _fast_copy(src, dst):
+    """Copy file lewat kernel (copy_file_range/reflink, lalu sendfile), fallback shutil.copy2"""
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            sfd, dfd = fsrc.fileno(), fdst.fileno()
+            remaining = os.fstat(sfd).st_size
+            
+            if hasattr(os, 'copy_file_range'):
+                try:
+                    while remaining > 0:
+                        copied = os.copy_file_range(sfd, dfd, remaining)
+                        if copied == 0:
+                            break
+                        remaining -= copied
+                except OSError:
+                    pass  # filesystem tidak mendukung, lanjut ke sendfile
+            
+            if remaining > 0:
+                # Offset sendfile milik file sumber, tulisan ke dst ikut posisi fd
+                offset = os.lseek(sfd, 0, os.SEEK_CUR)
+                while remaining > 0:
+                    sent = os.sendfile(dfd, sfd, offset, remaining)
+                    if sent == 0:
+                        break
+                    offset += sent
+                    remaining -= sent
+        
+        if remaining > 0:
+            raise OSError("copy kernel tidak lengkap")
+        shutil.copystat(src, dst)
+    except (OSError, AttributeError):
+        shutil.copy2(src, dst)
+
 def create_backup(file_path):
     """
     Fungsi untuk membuat backup file
@@ -140,7 +189,7 @@ def create_backup(file_path):
     try:
         # Buat folder backup jika belum ada
         backup_folder = "data/backup"
-        os.makedirs(backup_folder, exist_ok=True)
+        ensure_directory(backup_folder)
         
         # Generate nama file backup dengan timestamp
         filename = os.path.basename(file_path)
@@ -149,7 +198,7 @@ def create_backup(file_path):
         backup_path = os.path.join(backup_folder, backup_filename)
         
         # Copy file
-        shutil.copy2(file_path, backup_path)
+        _fast_copy(file_path, backup_path)
         
         return {
             'success': True,
@@ -171,17 +220,20 @@ def auto_backup_all():
         dict: Status backup
     """
     try:
-        results = []
-        
-        # Backup products
-        if os.path.exists("data/products.csv"):
-            result = create_backup("data/products.csv")
-            results.append(result)
-        
-        # Backup transactions
-        if os.path.exists("data/transactions.csv"):
-            result = create_backup("data/transactions.csv")
-            results.append(result)
+        # Products + file transaksi yang aktif (Parquet; CSV hanya jika belum dimigrasi)
+        transactions_path = ("data/transactions.parquet" if os.path.exists("data/transactions.parquet")
+                             else "data/transactions.csv")
+        paths = [
+            path for path in ("data/products.csv", transactions_path)
+            if os.path.exists(path)
+        ]
+        
+        # Semua copy dijalankan bersamaan; sendfile/copy_file_range melepas GIL
+        if len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+                results = list(executor.map(create_backup, paths))
+        else:
+            results = [create_backup(path) for path in paths]
         
         success_count = sum(1 for r in results if r['success'])
         
@@ -217,15 +269,14 @@ def clean_old_backups(days=7):
             }
         
         deleted_count = 0
-        cutoff_date = datetime.now() - pd.Timedelta(days=days)
+        cutoff_ts = (datetime.now() - timedelta(days=days)).timestamp()
         
-        for filename in os.listdir(backup_folder):
-            file_path = os.path.join(backup_folder, filename)
-            file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-            
-            if file_time < cutoff_date:
-                os.remove(file_path)
-                deleted_count += 1
+        # scandir: info file ikut dari satu pembacaan direktori, tanpa join/getmtime per file
+        with os.scandir(backup_folder) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime < cutoff_ts:
+                    os.remove(entry.path)
+                    deleted_count += 1
         
         return {
             'success': True,
@@ -241,6 +292,42 @@ def clean_old_backups(days=7):
 
 # ==================== FUNGSI EXPORT ====================
 
+def _write_excel_rows(df, filepath):
+    """Tulis DataFrame ke xlsx secara streaming: xlsxwriter constant_memory, fallback openpyxl write-only"""
+    # Sel kosong (NaN/NaT/NA) ditulis sebagai sel kosong, bukan teks 'nan'
+    if df.isna().to_numpy().any():
+        df = df.astype(object).where(df.notna(), None)
+    
+    header = [str(col) for col in df.columns]
+    
+    try:
+        import xlsxwriter  # import saat export saja
+    except ImportError:
+        xlsxwriter = None
+    
+    if xlsxwriter is not None:
+        wb = xlsxwriter.Workbook(filepath, {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+            'remove_timezone': True,
+            'strings_to_urls': False,
+        })
+        ws = wb.add_worksheet()
+        ws.write_row(0, 0, header)
+        for row_idx, row in enumerate(df.itertuples(index=False, name=None), start=1):
+            ws.write_row(row_idx, 0, row)
+        wb.close()
+        return
+    
+    from openpyxl import Workbook  # import saat export saja
+    
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(header)
+    for row in df.itertuples(index=False, name=None):
+        ws.append(row)
+    wb.save(filepath)
+
 def export_to_excel(df, filename_prefix):
     """
     Fungsi untuk export DataFrame ke Excel
@@ -254,15 +341,14 @@ def export_to_excel(df, filename_prefix):
     """
     try:
         # Buat folder exports jika belum ada
-        os.makedirs("data/exports", exist_ok=True)
+        ensure_directory("data/exports")
         
         # Generate nama file dengan timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{filename_prefix}_{timestamp}.xlsx"
         filepath = os.path.join("data/exports", filename)
         
-        # Export ke Excel
-        df.to_excel(filepath, index=False, engine='openpyxl')
+        _write_excel_rows(df, filepath)
         
         return filepath
         
@@ -270,6 +356,39 @@ def export_to_excel(df, filename_prefix):
         print(f"Error exporting to Excel: {e}")
         return None
 
+def export_to_excel_parts(df, filename_prefix, segment_size=250_000):
+    """
+    Fungsi untuk export DataFrame besar ke beberapa file Excel
+    
+    Args:
+        df: DataFrame yang akan di-export
+        filename_prefix: Prefix nama file
+        segment_size: Maksimal baris per file
+        
+    Returns:
+        list: Daftar path file Excel (kosong jika gagal)
+    """
+    if len(df) <= segment_size:
+        path = export_to_excel(df, filename_prefix)
+        return [path] if path else []
+    
+    try:
+        ensure_directory("data/exports")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        paths = []
+        for part, start in enumerate(range(0, len(df), segment_size), start=1):
+            filename = f"{filename_prefix}_{timestamp}_part{part}.xlsx"
+            filepath = os.path.join("data/exports", filename)
+            _write_excel_rows(df.iloc[start:start + segment_size], filepath)
+            paths.append(filepath)
+        
+        return paths
+        
+    except Exception as e:
+        print(f"Error exporting to Excel parts: {e}")
+        return []
+
 def export_to_csv(df, filename_prefix):
     """
     Fungsi untuk export DataFrame ke CSV
@@ -283,7 +402,7 @@ def export_to_csv(df, filename_prefix):
     """
     try:
         # Buat folder exports jika belum ada
-        os.makedirs("data/exports", exist_ok=True)
+        ensure_directory("data/exports")
         
         # Generate nama file dengan timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -338,6 +457,29 @@ def calculate_profit_margin(harga_jual, harga_modal):
     except:
         return 0
 
+def calculate_stock_value(df):
+    """
+    Fungsi untuk menghitung total nilai stok (stok x harga modal)
+    
+    Args:
+        df: DataFrame produk
+        
+    Returns:
+        int: Total nilai stok dalam Rupiah
+    """
+    stok = df['stok']
+    harga_modal = df['harga_modal']
+    
+    # np.dot hanya untuk kolom integer tanpa nilai kosong: cast float ber-NaN ke int64
+    # tidak error (NaN jadi -2^63) dan harga desimal akan terpotong
+    if (pd.api.types.is_integer_dtype(stok) and pd.api.types.is_integer_dtype(harga_modal)
+            and stok.notna().all() and harga_modal.notna().all()):
+        # int64 agar hasil kali kolom int32 tidak overflow
+        return int(np.dot(stok.to_numpy(dtype=np.int64), harga_modal.to_numpy(dtype=np.int64)))
+    
+    # Float / ada nilai kosong (NaN): jalur pandas yang melewati NaN
+    return (stok * harga_modal).sum()
+
 # ==================== FUNGSI DATA CLEANING ====================
 
 def clean_dataframe(df):
@@ -354,15 +496,15 @@ def clean_dataframe(df):
         # Hapus duplikat
         df = df.drop_duplicates()
         
-        # Fill NaN dengan 0 untuk kolom numerik
-        numeric_columns = df.select_dtypes(include=['number']).columns
-        df[numeric_columns] = df[numeric_columns].fillna(0)
-        
-        # Fill NaN dengan string kosong untuk kolom string
-        string_columns = df.select_dtypes(include=['object']).columns
-        df[string_columns] = df[string_columns].fillna('')
+        # Fill NaN sekali jalan: 0 untuk kolom numerik, string kosong untuk kolom string
+        fill_map = {}
+        for col, dtype in df.dtypes.items():
+            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+                fill_map[col] = 0
+            elif pd.api.types.is_object_dtype(dtype):
+                fill_map[col] = ''
         
-        return df
+        return df.fillna(fill_map) if fill_map else df
         
     except Exception as e:
         print(f"Error cleaning dataframe: {e}")
@@ -389,6 +531,8 @@ def remove_duplicates(df, subset=None):
 
 # ==================== FUNGSI LOGGING ====================
 
+LOG_COLUMNS = ['timestamp', 'user', 'activity_type', 'description']
+
 def log_activity(activity_type, description, user="admin"):
     """
     Fungsi untuk mencatat aktivitas sistem
@@ -405,24 +549,20 @@ def log_activity(activity_type, description, user="admin"):
         log_file = "data/activity_log.csv"
         
         # Buat log entry
-        log_entry = {
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'user': user,
-            'activity_type': activity_type,
-            'description': description
-        }
-        
-        # Load atau buat log file
-        if os.path.exists(log_file):
-            log_df = pd.read_csv(log_file)
-        else:
-            log_df = pd.DataFrame(columns=['timestamp', 'user', 'activity_type', 'description'])
-        
-        # Append log
-        log_df = pd.concat([log_df, pd.DataFrame([log_entry])], ignore_index=True)
-        
-        # Simpan
-        log_df.to_csv(log_file, index=False)
+        log_entry = [
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            user,
+            activity_type,
+            description
+        ]
+        
+        # Append satu baris saja, header hanya ditulis saat file baru dibuat
+        is_new = not os.path.exists(log_file)
+        with open(log_file, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if is_new:
+                writer.writerow(LOG_COLUMNS)
+            writer.writerow(log_entry)
         
         return True
         
@@ -430,6 +570,32 @@ def log_activity(activity_type, description, user="admin"):
         print(f"Error logging activity: {e}")
         return False
 
+def _read_log_tail(log_file, limit, avg_line_bytes=512):
+    """Baca `limit` baris terakhir CSV log dari ujung file tanpa parse seluruh isi"""
+    with open(log_file, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        window = max(limit, 1) * avg_line_bytes
+        
+        while True:
+            start = max(0, size - window)
+            f.seek(start)
+            chunk = f.read(size - start)
+            
+            if start > 0:
+                # Buang baris pertama yang kemungkinan terpotong
+                chunk = chunk.split(b'\n', 1)[1] if b'\n' in chunk else b''
+            
+            rows = list(csv.reader(io.StringIO(chunk.decode('utf-8', errors='replace'), newline='')))
+            if start == 0:
+                rows = rows[1:]  # lewati header
+            rows = [row for row in rows if len(row) == len(LOG_COLUMNS)]
+            
+            # Perbesar jendela baca jika baris belum cukup
+            if len(rows) >= limit or start == 0:
+                return rows[-limit:] if limit > 0 else []
+            window *= 2
+
 def get_recent_logs(limit=10):
     """
     Fungsi untuk mengambil log aktivitas terbaru
@@ -444,8 +610,8 @@ def get_recent_logs(limit=10):
         log_file = "data/activity_log.csv"
         
         if os.path.exists(log_file):
-            log_df = pd.read_csv(log_file)
-            return log_df.tail(limit)
+            rows = _read_log_tail(log_file, limit)
+            return pd.DataFrame(rows, columns=LOG_COLUMNS)
         else:
             return pd.DataFrame()
             